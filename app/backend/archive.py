@@ -0,0 +1,102 @@
+"""Move long-inactive rows into the ``*_archive`` tables.
+
+Run periodically, e.g. from cron::
+
+    python -m app.backend.archive --days 90 --batch-size 1000
+
+Every chunk is its own short transaction: pick up to ``batch_size`` ids (skipping rows
+locked by live requests), copy them into the archive table and delete them. Tables are
+processed children first, and a row is only moved once nothing active references it.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.backend.db import session_maker
+from app.models import Category, Product
+from app.models.archive import ARCHIVE_TABLES
+from app.models.review import Review
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def archivable(cutoff: datetime) -> dict:
+    child = aliased(Category)
+
+    def stale(model):
+        return (model.is_active == False) & (model.updated_at < cutoff)
+
+    return {
+        # Отзывы к давно удалённым товарам уходят вместе с товаром
+        Review: or_(stale(Review), Review.product_id.in_(select(Product.id).where(stale(Product)))),
+        Product: stale(Product) & ~exists().where(Review.product_id == Product.id),
+        Category: stale(Category)
+                  & ~exists().where(Product.category_id == Category.id)
+                  & ~exists().where(child.parent_id == Category.id),
+        User: stale(User)
+              & ~exists().where(Product.supplier_id == User.id)
+              & ~exists().where(Review.user_id == User.id),
+    }
+
+
+async def archive_chunk(session: AsyncSession, model, condition, batch_size: int) -> int:
+    archive = ARCHIVE_TABLES[model]
+    ids = (
+        await session.scalars(
+            select(model.id)
+            .where(condition)
+            .order_by(model.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .execution_options(include_inactive=True)
+        )
+    ).all()
+    if not ids:
+        return 0
+    columns = [column.name for column in model.__table__.columns]
+    await session.execute(
+        insert(archive).from_select(
+            columns,
+            select(*(model.__table__.c[name] for name in columns)).where(model.id.in_(ids))
+        )
+    )
+    await session.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+    await session.commit()
+    return len(ids)
+
+
+async def archive_inactive(older_than: timedelta, batch_size: int = 1000, pause: float = 0.05) -> dict[str, int]:
+    cutoff = datetime.now(timezone.utc) - older_than
+    moved = {}
+    for model, condition in archivable(cutoff).items():
+        total = 0
+        async with session_maker() as session:
+            while True:
+                count = await archive_chunk(session, model, condition, batch_size)
+                total += count
+                if count < batch_size:
+                    break
+                # Пауза между чанками, чтобы не забивать WAL и реплики
+                await asyncio.sleep(pause)
+        moved[model.__tablename__] = total
+        logger.info('Archived %s rows from %s', total, model.__tablename__)
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive long-inactive rows')
+    parser.add_argument('--days', type=int, default=90, help='archive rows inactive for longer than this')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(archive_inactive(timedelta(days=args.days), args.batch_size)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.db import session_maker
+from app.config import load_config
+from app.models.audit import AuditLog
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+
+def month_bounds(created_at: datetime) -> tuple[date, date]:
+    start = date(created_at.year, created_at.month, 1)
+    return start, date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+class AuditBuffer:
+    """Bounded in-memory queue of audit entries written by a background task in multi-row INSERTs.
+
+    ``record`` returns as soon as the entry is queued. When the queue is full it wakes the
+    writer and waits for room, so a stalled database slows writers down instead of losing entries.
+    """
+
+    def __init__(self, buffer_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=buffer_size)
+        self._full = asyncio.Event()
+        self._retry: list[dict[str, Any]] = []
+        self._partitions: set[date] = set()
+        self._task: asyncio.Task | None = None
+
+    async def record(self, actor: dict, action: str, target_type: str, target_id: Any,
+                     diff: dict | None = None) -> None:
+        entry = dict(
+            created_at=datetime.now(timezone.utc),
+            id=uuid.uuid4(),
+            actor_id=actor.get('id'),
+            actor=actor.get('username'),
+            action=action,
+            target_type=target_type,
+            target_id=str(target_id),
+            diff=diff,
+        )
+        if self._queue.full():
+            self._full.set()
+        await self._queue.put(entry)
+
+    def _next_batch(self) -> list[dict[str, Any]]:
+        batch, self._retry = self._retry, []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def flush(self) -> int:
+        written = 0
+        while batch := self._next_batch():
+            try:
+                await self._write(batch)
+            except BaseException:
+                # Пачка остаётся первой в очереди на запись
+                self._retry = batch
+                raise
+            written += len(batch)
+        return written
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        async with session_maker() as session:
+            if session.bind.dialect.name == 'postgresql':
+                await self._ensure_partitions(session, batch)
+            await session.execute(insert(AuditLog).values(batch))
+            await session.commit()
+
+    async def _ensure_partitions(self, session: AsyncSession, batch: list[dict[str, Any]]) -> None:
+        for created_at in {entry['created_at'] for entry in batch}:
+            start, end = month_bounds(created_at)
+            if start in self._partitions:
+                continue
+            try:
+                async with session.begin_nested():
+                    await session.execute(text(
+                        f'CREATE TABLE IF NOT EXISTS audit_log_y{start:%Y}m{start:%m} PARTITION OF audit_log '
+                        f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+                    ))
+            except DBAPIError:
+                # Например, строки этого месяца уже лежат в default-секции: пишем туда же
+                logger.exception('Could not create audit_log partition for %s', start)
+            self._partitions.add(start)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to write audit log, will retry')
+
+    def start(self) -> None:
+        if self._task is None:
+            # Event привязывается к циклу событий, создаём его в том цикле, где работает запись
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Последний шанс не потерять записи: выводим их в лог
+            lost = self._retry + [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+            self._retry = []
+            logger.exception('Failed to write %s audit entries on shutdown: %r', len(lost), lost)
+
+
+audit_log = AuditBuffer(config.audit.buffer_size, config.audit.batch_size, config.audit.flush_interval)
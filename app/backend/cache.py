@@ -0,0 +1,34 @@
+from time import monotonic
+from typing import Any, Hashable
+
+
+class SupplierCache:
+    """In-process cache of supplier dashboard results, grouped by supplier id.
+
+    Entries expire after ``ttl`` seconds and are dropped for a whole supplier at once
+    whenever one of their products or reviews changes.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._entries: dict[int, dict[Hashable, tuple[float, Any]]] = {}
+
+    def get(self, supplier_id: int, key: Hashable) -> Any | None:
+        entry = self._entries.get(supplier_id, {}).get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < monotonic():
+            self._entries[supplier_id].pop(key, None)
+            return None
+        return value
+
+    def set(self, supplier_id: int, key: Hashable, value: Any) -> None:
+        self._entries.setdefault(supplier_id, {})[key] = (monotonic() + self.ttl, value)
+
+    def invalidate(self, supplier_id: int | None) -> None:
+        if supplier_id is not None:
+            self._entries.pop(supplier_id, None)
+
+
+supplier_cache = SupplierCache()
@@ -0,0 +1,100 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него отдаём только gzip
+    brotli = None
+
+
+# Форматы, которые уже сжаты: повторное сжатие только тратит CPU
+COMPRESSED_CONTENT_TYPES = ('image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip',
+                            'application/x-7z-compressed', 'application/pdf')
+
+
+class PassthroughMixin:
+    """Sends already-compressed content types, Range responses and ``http.response.pathsend`` untouched."""
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            await super().send_with_compression(message)
+            headers = Headers(raw=message['headers'])
+            # Content-Range описывает байты несжатого тела, сжатый кусок ему бы не соответствовал
+            if headers.get('content-type', '').startswith(COMPRESSED_CONTENT_TYPES) or 'content-range' in headers:
+                self.content_type_is_excluded = True
+        elif message['type'] == 'http.response.body' and not (self.content_encoding_set
+                                                               or self.content_type_is_excluded):
+            await super().send_with_compression(message)
+        else:
+            # Starlette отбрасывает остальные сообщения, а FileResponse шлёт pathsend вместо тела
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+
+
+class PassthroughGZipResponder(PassthroughMixin, GZipResponder):
+    pass
+
+
+class PassthroughIdentityResponder(PassthroughMixin, IdentityResponder):
+    pass
+
+
+class BrotliResponder(PassthroughMixin, IdentityResponder):
+    content_encoding = 'br'
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 5) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        if more_body:
+            return compressed + self.compressor.flush()
+        return compressed + self.compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    encodings = set()
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """Brotli or gzip response compression, negotiated from Accept-Encoding.
+
+    Bodies shorter than ``minimum_size`` and already-compressed content types (images,
+    archives) are sent as is; streamed bodies are compressed chunk by chunk, so
+    StreamingResponse keeps streaming.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 5) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope).get('Accept-Encoding', ''))
+        if brotli is not None and 'br' in encodings:
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif 'gzip' in encodings:
+            responder = PassthroughGZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = PassthroughIdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, and_, false, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.backend.db import session_maker
+from app.backend.writes import dialect_insert
+from app.config import load_config
+from app.models import Product
+from app.models.currency import ExchangeRate
+from app.schemas import ProductOut
+
+config = load_config()
+logger = logging.getLogger(__name__)
+_products_adapter = TypeAdapter(list[ProductOut])
+
+# Число знаков после запятой в минимальных единицах, если не 2 (ISO 4217)
+MINOR_UNIT_EXPONENTS = {'JPY': 0, 'KRW': 0, 'VND': 0, 'CLP': 0, 'ISK': 0, 'UGX': 0,
+                        'BHD': 3, 'KWD': 3, 'OMR': 3, 'JOD': 3, 'TND': 3}
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """Immutable set of exchange rates; replaced as a whole, never modified in place."""
+    base: str
+    rates: dict[str, float]
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def factor(self, currency: str) -> float:
+        """Minor units of ``currency`` per one unit of the base currency, NaN if there is no rate."""
+        rate = self.rates.get(currency)
+        if rate is None:
+            return math.nan
+        return rate * 10 ** MINOR_UNIT_EXPONENTS.get(currency, 2)
+
+
+_snapshot = RateSnapshot(config.currency.base, {config.currency.base: 1.0})
+
+
+def get_rates() -> RateSnapshot:
+    return _snapshot
+
+
+def swap_rates(rates: dict[str, float]) -> RateSnapshot:
+    # Одно присваивание ссылки: запрос видит либо старый, либо новый набор курсов целиком
+    global _snapshot
+    _snapshot = RateSnapshot(config.currency.base, {**rates, config.currency.base: 1.0})
+    return _snapshot
+
+
+def check_currency(currency: str) -> str:
+    if currency not in get_rates().rates:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f'Unknown currency {currency}')
+    return currency
+
+
+def invalid_rates(rates: dict[str, float]) -> list[str]:
+    # Нулевой или бесконечный курс ломает пересчёт цен во всех листингах
+    return [currency for currency, rate in rates.items()
+            if len(currency) != 3 or not currency.isupper() or not (rate > 0 and math.isfinite(rate))]
+
+
+def read_rates_file(path: str) -> dict[str, float]:
+    """Read ``{"base": "RUB", "rates": {"USD": 0.0127, ...}}``; the base must match CURRENCY_BASE."""
+    with open(path) as file:
+        data = json.load(file)
+    if data.get('base', config.currency.base) != config.currency.base:
+        raise ValueError(f'Rates file is based on {data["base"]}, expected {config.currency.base}')
+    rates = {currency: float(rate) for currency, rate in data['rates'].items()}
+    if invalid := invalid_rates(rates):
+        raise ValueError(f'Invalid rates for {", ".join(invalid)}')
+    return rates
+
+
+async def load_rates(session: AsyncSession) -> RateSnapshot:
+    rows = (await session.execute(select(ExchangeRate.currency, ExchangeRate.rate))).all()
+    return swap_rates({currency: float(rate) for currency, rate in rows})
+
+
+async def save_rates(session: AsyncSession, rates: dict[str, float]) -> RateSnapshot:
+    """Upsert ``rates`` and swap them in; currencies not mentioned keep their stored rate."""
+    rows = [dict(currency=currency, rate=rate) for currency, rate in rates.items()
+            if currency != config.currency.base]
+    if rows:
+        statement = dialect_insert(session, ExchangeRate).values(rows)
+        await session.execute(statement.on_conflict_do_update(
+            index_elements=['currency'],
+            set_=dict(rate=statement.excluded.rate, updated_at=datetime.now(timezone.utc))
+        ))
+    await session.commit()
+    return await load_rates(session)
+
+
+def price_condition(min_price: int | None, max_price: int | None, currency: str | None,
+                    price: ColumnElement = Product.price) -> ColumnElement[bool] | None:
+    """WHERE clause for a price range in minor units of ``currency`` (the base currency by default).
+
+    Bounds are converted into every stored currency once, so the filter stays a plain
+    comparison on ``price`` per currency and can use the price index.
+    """
+    if min_price is None and max_price is None:
+        return None
+    snapshot = get_rates()
+    target = snapshot.factor(check_currency(currency or snapshot.base))
+    branches = []
+    for code in snapshot.rates:
+        ratio = snapshot.factor(code) / target
+        bounds = [Product.currency == code]
+        if min_price is not None:
+            bounds.append(price >= math.ceil(min_price * ratio - 1e-9))
+        if max_price is not None:
+            bounds.append(price <= math.floor(max_price * ratio + 1e-9))
+        branches.append(and_(*bounds))
+    return or_(*branches) if branches else false()
+
+
+def convert_prices(products: list, currency: str | None) -> list:
+    """ProductOut for every product, with ``display_price`` in ``currency`` computed in one NumPy pass."""
+    items = _products_adapter.validate_python(products, from_attributes=True)
+    if currency is None or not items:
+        return items
+    snapshot = get_rates()
+    target = snapshot.factor(check_currency(currency))
+    codes, inverse = np.unique([item.currency for item in items], return_inverse=True)
+    source = np.array([snapshot.factor(code) for code in codes])[inverse]
+    prices = np.fromiter((item.price for item in items), dtype=np.float64, count=len(items))
+    converted = np.rint(prices * (target / source))
+    for item, value in zip(items, converted.tolist()):
+        item.display_price = None if math.isnan(value) else int(value)
+        item.display_currency = currency
+    return items
+
+
+async def refresh_rates(interval: float) -> None:
+    # Курсы меняет один воркер (админ-эндпоинт или файл), остальные подхватывают их из базы
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_maker() as session:
+                await load_rates(session)
+        except Exception:
+            logger.exception('Failed to refresh exchange rates')
+
+
+_refresh_task: asyncio.Task | None = None
+
+
+async def start_rates() -> None:
+    global _refresh_task
+    async with session_maker() as session:
+        if config.currency.rates_file:
+            await save_rates(session, read_rates_file(config.currency.rates_file))
+        else:
+            await load_rates(session)
+    _refresh_task = asyncio.create_task(refresh_rates(config.currency.refresh_interval))
+
+
+async def stop_rates() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
@@ -1,11 +1,111 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, event, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import DeclarativeBase, Mapped, ORMExecuteState, Session, mapped_column, with_loader_criteria
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from app.config import Site, load_config
+
+
+def make_engine(site: Site) -> AsyncEngine:
+    if site.backend == 'sqlite':
+        if site.sqlite_path == ':memory:':
+            # Одно соединение на всё приложение, иначе у каждой сессии своя пустая база.
+            # Транзакции параллельных запросов при этом общие: режим только для тестов и разработки
+            return create_async_engine('sqlite+aiosqlite://', echo=True, poolclass=StaticPool)
+        return create_async_engine(f'sqlite+aiosqlite:///{site.sqlite_path}', echo=True)
+    return create_async_engine(site.postgres, echo=True)
 
-from app.config import load_config
 
 config = load_config()
-engine = create_async_engine(config.site.postgres, echo=True)
+engine = make_engine(config.site)
 session_maker = async_sessionmaker(engine)
 
+_query_counter: ContextVar[list[str] | None] = ContextVar('query_counter', default=None)
+
+
+@event.listens_for(engine.sync_engine, 'connect')
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Postgres проверяет внешние ключи всегда, sqlite - только с этой прагмой
+    if engine.dialect.name == 'sqlite':
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+@event.listens_for(engine.sync_engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    queries = _query_counter.get()
+    if queries is not None:
+        queries.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed in the current context, including tasks it starts."""
+    queries = []
+    token = _query_counter.set(queries)
+    try:
+        yield queries
+    finally:
+        _query_counter.reset(token)
+
+
+class unindexed(ColumnElement):
+    """``column`` that must not drive the query plan on SQLite; other dialects get the plain column.
+
+    SQLite has no value statistics and ignores LIMIT when costing, so it picks the index of a
+    range filter and sorts every match, even when walking the index of the ORDER BY key would
+    stop after one page. Postgres chooses well on its own and is left alone.
+    """
+    inherit_cache = True
+    _traverse_internals = [('column', InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, column: ColumnElement):
+        self.column = column
+        self.type = column.type
+
+
+@compiles(unindexed)
+def _compile_unindexed(element, compiler, **kw):
+    return compiler.process(element.column, **kw)
+
+
+@compiles(unindexed, 'sqlite')
+def _compile_unindexed_sqlite(element, compiler, **kw):
+    # Унарный плюс в SQLite ничего не вычисляет, но выражение с ним уже не ищется по индексу
+    return '+' + compiler.process(element.column, **kw)
+
+
 class Base(DeclarativeBase):
     pass
+
+
+class VersionedMixin:
+    # onupdate срабатывает и для ORM flush, и для update() в роутерах
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1',
+                                         onupdate=literal_column('version') + 1)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(),
+                                                 onupdate=func.now())
+
+
+class SoftDeleteMixin:
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_inactive_rows(execute_state: ORMExecuteState):
+    # Все SELECT по моделям с SoftDeleteMixin видят только is_active строки, включая join и
+    # ленивую загрузку связей. Отключается через .execution_options(include_inactive=True)
+    if (execute_state.is_select
+            and not execute_state.is_column_load
+            and not execute_state.execution_options.get('include_inactive', False)):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(SoftDeleteMixin, lambda cls: cls.is_active == True, include_aliases=True)
+        )
@@ -6,4 +6,4 @@ from app.backend.db import session_maker
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with session_maker() as session:
-        return session
\ No newline at end of file
+        yield session
\ No newline at end of file
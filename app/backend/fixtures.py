@@ -0,0 +1,65 @@
+"""Schema bootstrap and fixture snapshots for the sqlite backend (``DB_BACKEND=sqlite``).
+
+A test suite or benchmark seeds the database once, takes a snapshot and restores it
+before every test instead of re-seeding::
+
+    await create_schema()
+    await seed()
+    snapshot = await take_snapshot()
+    ...
+    await restore_snapshot(snapshot)
+
+Snapshots use the sqlite online backup API, so copying even a large seeded database
+is a page copy rather than a replay of inserts.
+"""
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+from app.backend.db import Base, engine
+# Все модели должны быть импортированы, чтобы create_all увидел их таблицы
+from app.models import Category, Product
+from app.models.archive import ARCHIVE_TABLES
+from app.models.audit import AuditLog
+from app.models.currency import ExchangeRate
+from app.models.recommendation import Recommendation
+from app.models.review import Review
+from app.models.user import User
+
+
+async def create_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def drop_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@asynccontextmanager
+async def sqlite_connection():
+    """The aiosqlite connection behind ``engine``, checked out of the pool."""
+    if engine.dialect.name != 'sqlite':
+        raise RuntimeError('Snapshots need the sqlite backend, set DB_BACKEND=sqlite')
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        yield raw.driver_connection
+
+
+async def take_snapshot(path: str = ':memory:') -> aiosqlite.Connection:
+    """Copy the current database into ``path`` (in memory by default) and return it open."""
+    snapshot = await aiosqlite.connect(path)
+    async with sqlite_connection() as live:
+        await live.backup(snapshot)
+    return snapshot
+
+
+async def restore_snapshot(snapshot: aiosqlite.Connection | str) -> None:
+    """Replace the current database with a snapshot, or with a snapshot file saved earlier."""
+    if isinstance(snapshot, str):
+        async with aiosqlite.connect(snapshot) as source:
+            await restore_snapshot(source)
+        return
+    async with sqlite_connection() as live:
+        await snapshot.backup(live)
@@ -0,0 +1,214 @@
+"""Fill an empty database with a large, deterministic synthetic shop.
+
+For load tests and benchmarks, e.g.::
+
+    python -m app.backend.generate --seed 42 --users 50000 --categories 500 --products 1000000 --reviews 3000000
+
+The same seed always produces the same rows. The shape is meant to look like a real shop:
+a deep category tree, products skewed towards a few popular categories, Zipf-distributed
+review counts and users with mixed roles. Derived fields match what the routers would
+have written: slugs are ``slugify(name)`` and ``Product.rating`` is the mean review grade.
+
+Postgres through asyncpg is loaded with ``COPY``; other drivers and backends (psycopg,
+aiosqlite) with batched ``executemany``.
+Every user can log in with the password ``password``.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.backend.db import engine
+from app.config import load_config
+from app.models import Category, Product
+from app.models.review import Review
+from app.models.user import User
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+# bcrypt('password') с фиксированной солью и минимальной стоимостью: один хэш на всех, вход быстрый
+PASSWORD_HASH = '$2b$04$shopgeneratorfixedsalu.OOdqeuT8ux9Y2ASURt5vpeehVr9B32'
+# Отсчёт дат фиксирован, чтобы результат не зависел от дня запуска
+NOW = datetime(2025, 7, 1)
+ADJECTIVES = ['red', 'smart', 'compact', 'classic', 'wireless', 'premium', 'eco', 'pro', 'mini', 'ultra',
+              'vintage', 'sport', 'digital', 'soft', 'steel', 'wooden', 'portable', 'silent', 'solar', 'urban']
+NOUNS = ['phone', 'lamp', 'chair', 'kettle', 'backpack', 'watch', 'speaker', 'jacket', 'blender', 'camera',
+         'mouse', 'desk', 'bottle', 'drill', 'sneakers', 'monitor', 'tent', 'router', 'guitar', 'pillow']
+COMMENTS = ['Great value', 'Works as described', 'Broke after a week', 'Fast delivery', 'Would buy again',
+            'Not worth the price', 'Exactly what I needed', 'Average quality']
+# Распределение оценок: довольных больше, как на любом маркетплейсе
+GRADE_WEIGHTS = [0.06, 0.07, 0.14, 0.30, 0.43]
+
+
+def zipf_weights(rng: np.random.Generator, count: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def generate_users(rng: np.random.Generator, count: int) -> dict[str, list]:
+    ids = np.arange(1, count + 1)
+    roles = rng.choice(3, size=count, p=[0.002, 0.05, 0.948])
+    roles[0] = 0
+    return {
+        'id': ids.tolist(),
+        'first_name': [f'First{i}' for i in ids.tolist()],
+        'last_name': [f'Last{i}' for i in ids.tolist()],
+        'username': [f'user{i}' for i in ids.tolist()],
+        'email': [f'user{i}@example.com' for i in ids.tolist()],
+        'hashed_password': [PASSWORD_HASH] * count,
+        'is_admin': (roles == 0).tolist(),
+        'is_supplier': (roles == 1).tolist(),
+        'is_customer': (roles == 2).tolist(),
+        'is_active': [True] * count,
+    }
+
+
+def generate_categories(rng: np.random.Generator, count: int, depth: int) -> dict[str, list]:
+    roots = count if depth <= 1 else max(1, count // 20)
+    parents: list[int | None] = [None] * roots
+    levels = [0] * roots
+    for category_id in range(roots + 1, count + 1):
+        # Родитель выбирается среди категорий, у которых ещё есть место в глубину
+        while True:
+            parent = int(rng.integers(1, category_id))
+            if levels[parent - 1] < depth - 1:
+                break
+        parents.append(parent)
+        levels.append(levels[parent - 1] + 1)
+    ids = list(range(1, count + 1))
+    return {
+        'id': ids,
+        'name': [f'Category {i}' for i in ids],
+        'slug': [f'category-{i}' for i in ids],
+        'parent_id': parents,
+        'is_active': [True] * count,
+    }
+
+
+def generate_products(rng: np.random.Generator, count: int, categories: int,
+                      suppliers: np.ndarray) -> dict[str, list]:
+    ids = np.arange(1, count + 1)
+    adjectives = rng.integers(0, len(ADJECTIVES), count).tolist()
+    nouns = rng.integers(0, len(NOUNS), count).tolist()
+    names = [f'{ADJECTIVES[a].capitalize()} {NOUNS[n]} {i}' for a, n, i in zip(adjectives, nouns, ids.tolist())]
+    category_ids = rng.choice(np.arange(1, categories + 1), size=count, p=zipf_weights(rng, categories, 1.1))
+    stock = rng.integers(0, 200, count)
+    stock[rng.random(count) < 0.1] = 0
+    return {
+        'id': ids.tolist(),
+        'name': names,
+        # slugify(name): в именах только латиница, цифры и пробелы
+        'slug': [name.lower().replace(' ', '-') for name in names],
+        'description': [f'{name}. Synthetic product for load testing.' for name in names],
+        # Цены в минимальных единицах базовой валюты, целыми рублями
+        'price': (np.maximum(1, rng.lognormal(7.5, 1.2, count)).astype(np.int64) * 100).tolist(),
+        'currency': [config.currency.base] * count,
+        'image_url': [''] * count,
+        'stock': stock.tolist(),
+        'rating': [0.0] * count,
+        'supplier_id': rng.choice(suppliers, size=count).tolist() if len(suppliers) else [None] * count,
+        'category_id': category_ids.tolist(),
+        'is_active': [True] * count,
+    }
+
+
+def generate_reviews(rng: np.random.Generator, count: int, products: dict[str, list],
+                     customers: np.ndarray) -> dict[str, list]:
+    """Reviews with Zipf-distributed counts per product; also fills ``products['rating']``."""
+    product_count = len(products['id'])
+    per_product = rng.multinomial(count, zipf_weights(rng, product_count, 1.0))
+    product_ids = np.repeat(np.arange(1, product_count + 1), per_product)
+    grades = rng.choice(np.arange(1, 6), size=count, p=GRADE_WEIGHTS)
+
+    # Рейтинг товара - среднее по его отзывам, как в create_review
+    totals = np.bincount(product_ids, weights=grades, minlength=product_count + 1)[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        products['rating'] = np.where(per_product > 0, totals / per_product, 0.0).tolist()
+
+    seconds = rng.integers(0, 2 * 365 * 24 * 3600, count).astype('timedelta64[s]')
+    comments = rng.integers(0, len(COMMENTS), count).tolist()
+    return {
+        'id': list(range(1, count + 1)),
+        'user_id': rng.choice(customers, size=count).tolist(),
+        'product_id': product_ids.tolist(),
+        'comment': [COMMENTS[c] for c in comments],
+        'comment_date': (np.datetime64(NOW, 's') - seconds).tolist(),
+        'grade': grades.tolist(),
+        'is_active': [True] * count,
+    }
+
+
+async def copy_rows(conn: AsyncConnection, table: Table, columns: dict[str, list], batch_size: int) -> None:
+    names = list(columns)
+    rows = zip(*columns.values())
+    total = len(columns[names[0]])
+    if conn.dialect.driver == 'asyncpg':
+        raw = await conn.get_raw_connection()
+        # COPY ... FROM STDIN в бинарном формате есть только у asyncpg
+        await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=names)
+    else:
+        statement = insert(table)
+        for start in range(0, total, batch_size):
+            batch = [dict(zip(names, row)) for _, row in zip(range(batch_size), rows)]
+            await conn.execute(statement, batch)
+    if conn.dialect.name == 'postgresql':
+        # id заданы явно, последовательность сама не сдвинется
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), {max(total, 1)})"
+        ))
+
+
+async def generate(seed: int, users: int, categories: int, depth: int, products: int, reviews: int,
+                   batch_size: int = 10000) -> dict[str, int]:
+    rng = np.random.default_rng(seed)
+    user_rows = generate_users(rng, users)
+    suppliers = np.flatnonzero(user_rows['is_supplier']) + 1
+    customers = np.flatnonzero(user_rows['is_customer']) + 1
+    category_rows = generate_categories(rng, categories, depth)
+    product_rows = generate_products(rng, products, categories, suppliers)
+    review_rows = generate_reviews(rng, reviews, product_rows, customers if len(customers) else np.array([1]))
+
+    counts = {}
+    async with engine.begin() as conn:
+        for model in (User, Category, Product, Review):
+            if await conn.scalar(select(func.count()).select_from(model.__table__)):
+                raise RuntimeError(f'Table {model.__tablename__} is not empty, generate into an empty database')
+        for model, rows in ((User, user_rows), (Category, category_rows),
+                            (Product, product_rows), (Review, review_rows)):
+            started = time.perf_counter()
+            await copy_rows(conn, model.__table__, rows, batch_size)
+            counts[model.__tablename__] = len(rows['id'])
+            logger.info('Loaded %s rows into %s in %.1fs', len(rows['id']), model.__tablename__,
+                        time.perf_counter() - started)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic shop dataset',
+        epilog='Throughput was measured on sqlite only: about 4.3M rows/min for 100k products and 300k '
+               'reviews. COPY into Postgres (asyncpg) has not been benchmarked yet.'
+    )
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--categories', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=4, help='maximum depth of the category tree')
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--reviews', type=int, default=300000)
+    parser.add_argument('--batch-size', type=int, default=10000, help='rows per executemany when COPY is not available (any driver but asyncpg)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    counts = asyncio.run(generate(args.seed, args.users, args.categories, args.depth, args.products,
+                                  args.reviews, args.batch_size))
+    print(counts, f'{sum(counts.values()) / (time.perf_counter() - started) * 60:.0f} rows/min')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import os
+import re
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from app.config import load_config
+
+config = load_config()
+
+IMAGE_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+MEDIA_TYPES = {'jpeg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp', 'gif': 'image/gif'}
+# Максимальная сторона превью в пикселях
+VARIANT_SIZES = {'thumb': 256, 'medium': 768}
+VARIANT_FORMATS = {'jpeg': 'JPEG', 'webp': 'WEBP'}
+
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+FILENAME_RE = re.compile(r'^(original|thumb|medium)\.(jpeg|png|webp|gif)$')
+IMAGE_URL_RE = re.compile(r'^/images/([0-9a-f]{64})/original\.(jpeg|png|webp|gif)$')
+
+
+def image_dir(digest: str) -> Path:
+    return Path(config.media.root) / digest[:2] / digest
+
+
+def image_path(digest: str, filename: str) -> Path:
+    return image_dir(digest) / filename
+
+
+def image_url(digest: str, filename: str) -> str:
+    return f'/images/{digest}/{filename}'
+
+
+def variant_urls(digest: str, original_ext: str) -> dict[str, str]:
+    urls = {'original': image_url(digest, f'original.{original_ext}')}
+    for variant in VARIANT_SIZES:
+        urls[variant] = image_url(digest, f'{variant}.jpeg')
+        urls[f'{variant}_webp'] = image_url(digest, f'{variant}.webp')
+    return urls
+
+
+def variants_from_url(url: str | None) -> dict[str, str] | None:
+    match = IMAGE_URL_RE.match(url or '')
+    if match is None:
+        return None
+    return variant_urls(*match.groups())
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def store_image(data: bytes) -> tuple[str, str]:
+    """Validate an upload, store it under its sha256 and render every variant.
+
+    Runs inside a worker process. Returns the digest and the original's extension;
+    raises ValueError for anything Pillow cannot read or an unsupported format.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    directory = image_dir(digest)
+    try:
+        with Image.open(BytesIO(data)) as image:
+            ext = IMAGE_FORMATS.get(image.format)
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError('File is not a valid image') from exc
+    if ext is None:
+        raise ValueError(f'Unsupported image format {image.format}')
+
+    original = directory / f'original.{ext}'
+    if original.exists() and all(
+            (directory / f'{variant}.{fmt}').exists() for variant in VARIANT_SIZES for fmt in VARIANT_FORMATS):
+        return digest, ext
+
+    directory.mkdir(parents=True, exist_ok=True)
+    if not original.exists():
+        _write_atomic(original, data)
+
+    with Image.open(original) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for variant, size in VARIANT_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for fmt, pil_format in VARIANT_FORMATS.items():
+                buffer = BytesIO()
+                resized.save(buffer, pil_format, quality=82, optimize=True)
+                _write_atomic(directory / f'{variant}.{fmt}', buffer.getvalue())
+    return digest, ext
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=config.media.workers)
+    return _executor
+
+
+async def save_upload(data: bytes) -> tuple[str, str]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), store_image, data)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,93 @@
+import base64
+import json
+import math
+
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, Float, Integer, Select, tuple_
+from starlette import status
+
+from app.backend.currency import check_currency, price_condition
+from app.backend.db import unindexed
+from app.models import Product
+from app.schemas import ProductFilter
+
+# Колонки ключа сортировки и направление; id всегда последний, чтобы ключ был уникальным
+SORT_KEYS = {
+    None: ((Product.id,), False),
+    'price': ((Product.price, Product.id), False),
+    '-price': ((Product.price, Product.id), True),
+    'rating': ((Product.rating, Product.id), True),
+    'newest': ((Product.id,), True),
+    'popular': ((Product.popularity, Product.id), True),
+}
+# Integer в Postgres 4-байтный, BigInteger 8-байтный: большее значение из курсора asyncpg не примет
+INTEGER_RANGE = range(-2 ** 31, 2 ** 31)
+BIGINT_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def encode_cursor(product, sort: str | None) -> str:
+    columns, _ = SORT_KEYS[sort]
+    payload = json.dumps([sort, [getattr(product, column.key) for column in columns]])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def cursor_value(value, column):
+    # bool - подкласс int, его отсекаем сравнением типов
+    if isinstance(column.type, Integer) and type(value) is int \
+            and value in (BIGINT_RANGE if isinstance(column.type, BigInteger) else INTEGER_RANGE):
+        return value
+    if isinstance(column.type, Float) and type(value) in (int, float) and math.isfinite(value):
+        return float(value)
+    raise ValueError(f'Invalid cursor value for {column.key}')
+
+
+def decode_cursor(cursor: str, sort: str | None) -> list:
+    columns, _ = SORT_KEYS[sort]
+    try:
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort or not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('Cursor does not match the sort order')
+        return [cursor_value(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail='Invalid cursor')
+
+
+def filter_products(statement: Select, params: ProductFilter) -> Select:
+    """Apply ProductFilter to a ``select(Product)``: WHERE filters, keyset cursor, ORDER BY and LIMIT.
+
+    With ``limit`` set one extra row is fetched, so the caller can tell whether there is a next page.
+    """
+    if params.currency is not None:
+        # Проверяем до запроса: при потоковой выдаче ошибку уже не вернуть
+        check_currency(params.currency)
+    columns, descending = SORT_KEYS[params.sort]
+
+    def filter_column(column):
+        # Страницу ведёт индекс ключа сортировки: с курсором - от курсора, без него - от фильтра
+        # по первой колонке ключа. Остальные фильтры проверяются по строкам, см. unindexed
+        return column if column is columns[0] and params.cursor is None else unindexed(column)
+
+    if params.in_stock:
+        statement = statement.where(Product.stock > 0)
+    prices = price_condition(params.min_price, params.max_price, params.currency, filter_column(Product.price))
+    if prices is not None:
+        statement = statement.where(prices)
+    if params.min_rating is not None:
+        statement = statement.where(filter_column(Product.rating) >= params.min_rating)
+
+    if params.cursor is not None:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(params.cursor, params.sort))
+        statement = statement.where(key < values if descending else key > values)
+    statement = statement.order_by(*(column.desc() if descending else column for column in columns))
+    if params.limit is not None:
+        statement = statement.limit(params.limit + 1)
+    return statement
+
+
+def split_page(products: list, params: ProductFilter) -> tuple[list, str | None]:
+    if params.limit is None or len(products) <= params.limit:
+        return products, None
+    products = products[:params.limit]
+    return products, encode_cursor(products[-1], params.sort)
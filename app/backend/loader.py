@@ -0,0 +1,91 @@
+import asyncio
+from typing import Annotated, Any
+
+from fastapi import Depends
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.db_depends import get_db
+from app.models import Category, Product
+from app.models.user import User
+
+# Поля, по которым можно искать; найденная строка кэшируется сразу по всем
+LOOKUP_KEYS = {
+    Product: ('id', 'slug'),
+    Category: ('id', 'slug'),
+    User: ('id', 'username'),
+}
+
+
+class Loader:
+    """Request-scoped, DataLoader-style lookups of products, categories and users.
+
+    Lookups of a model made in the same event-loop tick (e.g. under ``asyncio.gather``) are sent
+    as one ``SELECT ... WHERE id IN (...) OR slug IN (...)``; repeated lookups are answered from memory.
+    Missing and soft-deleted rows load as None.
+
+    Use it where lookups fan out (``load_many``, loops gathered over rows); a single lookup is
+    just ``session.get``. The batch runs in a separate task on ``session``, and an AsyncSession
+    does not allow concurrent operations: gather loader calls only with other loader calls,
+    never with queries of your own on the same session.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._results: dict[tuple, Any] = {}
+        self._pending: dict[Any, dict[tuple[str, Any], asyncio.Future]] = {}
+        self._dispatch: asyncio.Task | None = None
+
+    async def load(self, model, **lookup):
+        (key, value), = lookup.items()
+        if key not in LOOKUP_KEYS[model]:
+            raise ValueError(f'{model.__name__} cannot be looked up by {key}')
+        if (model, key, value) in self._results:
+            return self._results[model, key, value]
+        futures = self._pending.setdefault(model, {})
+        if (key, value) not in futures:
+            futures[key, value] = asyncio.get_running_loop().create_future()
+            if self._dispatch is None:
+                self._dispatch = asyncio.create_task(self._run())
+        return await asyncio.shield(futures[key, value])
+
+    async def load_many(self, model, key: str, values) -> list:
+        return await asyncio.gather(*(self.load(model, **{key: value}) for value in values))
+
+    def clear(self) -> None:
+        """Forget loaded rows, e.g. after the request changed them."""
+        self._results.clear()
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                for model, futures in batch.items():
+                    await self._fetch(model, futures)
+        finally:
+            self._dispatch = None
+
+    async def _fetch(self, model, futures: dict[tuple[str, Any], asyncio.Future]) -> None:
+        by_key: dict[str, list] = {}
+        for key, value in futures:
+            by_key.setdefault(key, []).append(value)
+        condition = or_(*(getattr(model, key).in_(values) for key, values in by_key.items()))
+        try:
+            rows = (await self.session.scalars(select(model).where(condition))).all()
+        except Exception as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for row in rows:
+            for lookup_key in LOOKUP_KEYS[model]:
+                self._results[model, lookup_key, getattr(row, lookup_key)] = row
+        for (key, value), future in futures.items():
+            self._results.setdefault((model, key, value), None)
+            if not future.done():
+                future.set_result(self._results[model, key, value])
+
+
+async def get_loader(session: Annotated[AsyncSession, Depends(get_db)]) -> Loader:
+    # FastAPI кэширует зависимости в пределах запроса: роутер и loader делят одну сессию
+    return Loader(session)
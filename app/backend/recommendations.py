@@ -0,0 +1,182 @@
+"""Rebuild the ``product_recommendations`` lookup table.
+
+Run periodically, e.g. from cron::
+
+    python -m app.backend.recommendations --top 10
+
+Two lists are built for every active product:
+
+* ``TOP_IN_CATEGORY`` - best rated in-stock products of the product's own category; if it
+  has too few of them, of the parent's subtree, and so on up to the root
+  (found through ``Category.parent_id``);
+* ``ALSO_REVIEWED`` - products most often reviewed by the same users.
+
+Everything is computed in memory with NumPy from three narrow reads and written back
+in one transaction, so readers never see a half-built table.
+"""
+import argparse
+import asyncio
+import logging
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from app.backend.db import session_maker
+from app.models import Category, Product
+from app.models.recommendation import ALSO_REVIEWED, TOP_IN_CATEGORY, Recommendation
+from app.models.review import Review
+
+logger = logging.getLogger(__name__)
+
+# Отзывы пользователя сверх этого числа не учитываются: пары растут квадратично
+MAX_ITEMS_PER_USER = 200
+
+
+def category_paths(category_ids: np.ndarray, parent_ids: np.ndarray) -> dict[int, list[int]]:
+    """Every category with its ancestors, nearest first: ``{leaf: [leaf, parent, ..., root]}``."""
+    parents = dict(zip(category_ids.tolist(), parent_ids.tolist()))
+    paths = {}
+    for category_id in parents:
+        path = [category_id]
+        while parents.get(path[-1], -1) != -1 and parents[path[-1]] not in path:
+            path.append(parents[path[-1]])
+        paths[category_id] = path
+    return paths
+
+
+def top_in_category(product_ids: np.ndarray, paths: np.ndarray, ratings: np.ndarray,
+                    in_stock: np.ndarray, top: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(product_id, rank, related_id) with the ``top`` best rated in-stock products of each product's category.
+
+    ``paths`` has a row per product: its category, then the ancestors up to the root, padded
+    with -1. A category with fewer than ``top + 1`` in-stock products in its subtree is
+    replaced by the nearest ancestor that has enough, or by the root.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    known = paths != -1
+    # Кандидаты - пары (категория пути, товар): товар входит в поддерево каждого своего предка
+    rows, levels = np.nonzero(known & in_stock[:, None])
+    if not len(rows):
+        return empty, empty, empty
+    keys = paths[rows, levels]
+
+    categories, sizes = np.unique(keys, return_counts=True)
+    index = np.minimum(np.searchsorted(categories, paths), len(categories) - 1)
+    enough = known & (categories[index] == paths) & (sizes[index] > top)
+    level = np.where(enough.any(axis=1), enough.argmax(axis=1), known.sum(axis=1) - 1)
+    buckets = paths[np.arange(len(paths)), level]
+
+    # Сортировка по категории, затем по рейтингу (убыв.) и id
+    order = np.lexsort((product_ids[rows], -ratings[rows], keys))
+    sorted_keys, sorted_rows = keys[order], rows[order]
+    starts = np.searchsorted(sorted_keys, buckets)
+    ends = np.searchsorted(sorted_keys, buckets, side='right')
+
+    # Берём top + 1 лучших, чтобы после исключения самого товара осталось top
+    offsets = np.arange(top + 1)
+    positions = starts[:, None] + offsets[None, :]
+    valid = positions < ends[:, None]
+    related = np.where(valid, product_ids[sorted_rows[np.minimum(positions, len(order) - 1)]], -1)
+    valid &= related != product_ids[:, None]
+    ranks = np.cumsum(valid, axis=1) - 1
+    valid &= ranks < top
+
+    rows, cols = np.nonzero(valid)
+    return product_ids[rows], ranks[rows, cols], related[rows, cols]
+
+
+def also_reviewed(user_ids: np.ndarray, review_product_ids: np.ndarray, product_ids: np.ndarray,
+                  top: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(product_id, rank, related_id) by how many users reviewed both products."""
+    empty = np.empty(0, dtype=np.int64)
+    # Переводим id товаров в плотные индексы 0..n-1, отзывы к неактивным товарам отбрасываем
+    index = np.searchsorted(product_ids, review_product_ids)
+    known = (index < len(product_ids)) & (product_ids[np.minimum(index, len(product_ids) - 1)] == review_product_ids)
+    pairs = np.unique(np.stack([user_ids[known], index[known]], axis=1), axis=0)
+    if len(pairs) < 2:
+        return empty, empty, empty
+    users, items = pairs[:, 0], pairs[:, 1]
+
+    # Каждый пользователь - отрезок [start, end) в отсортированном массиве
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    sizes = np.minimum(np.diff(np.r_[starts, len(users)]), MAX_ITEMS_PER_USER)
+    n = len(product_ids)
+    codes = []
+    for size in np.unique(sizes[sizes > 1]):
+        group = starts[sizes == size]
+        baskets = items[group[:, None] + np.arange(size)[None, :]]
+        first, second = np.triu_indices(size, k=1)
+        a, b = baskets[:, first].ravel(), baskets[:, second].ravel()
+        codes.append(np.concatenate([a * n + b, b * n + a]))
+    if not codes:
+        return empty, empty, empty
+    pair_codes, counts = np.unique(np.concatenate(codes), return_counts=True)
+    source, target = np.divmod(pair_codes, n)
+
+    order = np.lexsort((target, -counts, source))
+    source, target = source[order], target[order]
+    group_start = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+    ranks = np.arange(len(source)) - np.repeat(group_start, np.diff(np.r_[group_start, len(source)]))
+    keep = ranks < top
+    return product_ids[source[keep]], ranks[keep], product_ids[target[keep]]
+
+
+async def build_recommendations(top: int = 10) -> dict[str, int]:
+    async with session_maker() as session:
+        products = (
+            await session.execute(
+                select(Product.id, Product.category_id, Product.rating, Product.stock > 0)
+                .order_by(Product.id)
+            )
+        ).all()
+        categories = (await session.execute(select(Category.id, Category.parent_id))).all()
+        reviews = (await session.execute(select(Review.user_id, Review.product_id))).all()
+
+    product_ids = np.array([row[0] for row in products], dtype=np.int64)
+    if not len(product_ids):
+        rows = []
+    else:
+        paths = category_paths(np.array([row[0] for row in categories], dtype=np.int64),
+                               np.array([-1 if row[1] is None else row[1] for row in categories], dtype=np.int64))
+        product_paths = [paths.get(row[1], [row[1]]) for row in products]
+        depth = max(map(len, product_paths))
+        product_paths = np.array([path + [-1] * (depth - len(path)) for path in product_paths], dtype=np.int64)
+        ratings = np.array([row[2] or 0.0 for row in products], dtype=np.float64)
+        in_stock = np.array([bool(row[3]) for row in products])
+
+        rows = []
+        for kind, (sources, ranks, related) in (
+                (TOP_IN_CATEGORY, top_in_category(product_ids, product_paths, ratings, in_stock, top)),
+                (ALSO_REVIEWED, also_reviewed(np.array([row[0] for row in reviews], dtype=np.int64),
+                                              np.array([row[1] for row in reviews], dtype=np.int64),
+                                              product_ids, top)),
+        ):
+            rows.extend(
+                {'product_id': source, 'kind': kind, 'rank': rank, 'related_id': related_id}
+                for source, rank, related_id in zip(sources.tolist(), ranks.tolist(), related.tolist())
+            )
+
+    async with session_maker() as session:
+        await session.execute(delete(Recommendation))
+        if rows:
+            await session.execute(insert(Recommendation), rows)
+        await session.commit()
+
+    built = {
+        'top_in_category': sum(row['kind'] == TOP_IN_CATEGORY for row in rows),
+        'also_reviewed': sum(row['kind'] == ALSO_REVIEWED for row in rows),
+    }
+    logger.info('Rebuilt recommendations: %s', built)
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild product recommendations')
+    parser.add_argument('--top', type=int, default=10, help='items per list')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(build_recommendations(args.top)))
+
+
+if __name__ == '__main__':
+    main()
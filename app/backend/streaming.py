@@ -0,0 +1,60 @@
+import logging
+from collections.abc import AsyncIterator, Callable, Sequence
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, tuple_
+
+from app.backend.db import session_maker
+
+logger = logging.getLogger(__name__)
+
+STREAM_BATCH_SIZE = 1000
+
+
+async def iter_json_array(statement: Select, schema: type[BaseModel], key: Sequence,
+                          descending: bool = False, batch_size: int = STREAM_BATCH_SIZE,
+                          transform: Callable[[list], list] | None = None) -> AsyncIterator[bytes]:
+    """Encode the rows of ``statement`` as a JSON array, one chunk per batch.
+
+    ``statement`` must be ordered by the unique ``key`` columns. Rows are read in keyset
+    batches of ``batch_size``, each in its own short session, so at most one batch is held
+    in memory and a slow client holds no pooled connection while it downloads. ``transform``
+    is applied to each batch before encoding.
+
+    If a batch fails, the error is logged and re-raised, which aborts the connection: the
+    client never gets the closing ``]`` and can tell that the body is incomplete.
+    """
+    adapter = TypeAdapter(list[schema])
+    columns = tuple_(*key)
+    last = None
+    sent = 0
+    yield b'['
+    try:
+        while True:
+            page = statement
+            if last is not None:
+                page = page.where(columns < tuple_(*last) if descending else columns > tuple_(*last))
+            async with session_maker() as session:
+                rows = (await session.scalars(page.limit(batch_size))).all()
+            if not rows:
+                break
+            last = [getattr(rows[-1], column.key) for column in key]
+            if transform is not None:
+                rows = transform(rows)
+            # Батч сериализуется pydantic-core целиком, скобки массива отрезаются
+            chunk = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))[1:-1]
+            yield chunk if not sent else b',' + chunk
+            sent += len(rows)
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        logger.exception('JSON stream aborted after %s rows', sent)
+        raise
+    yield b']'
+
+
+def stream_json_array(statement: Select, schema: type[BaseModel], key: Sequence, descending: bool = False,
+                      transform: Callable[[list], list] | None = None) -> StreamingResponse:
+    return StreamingResponse(iter_json_array(statement, schema, key, descending, transform=transform),
+                             media_type='application/json')
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import math
+from datetime import datetime, timezone
+
+from sqlalchemy import Float, Integer, bindparam, case, column, func, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.db import session_maker
+from app.config import load_config
+from app.models import Product
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+# Popularity хранится в логарифмах: ln(сумма просмотров * e^(rate * t)), t в часах от EPOCH.
+# Новые просмотры весят экспоненциально больше старых, поэтому сортировка по колонке и есть
+# сортировка по затухающему счётчику, а пересчитывать старые строки не нужно
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DECAY_RATE = math.log(2) / config.popularity.half_life_hours
+
+
+def view_weight(count: int, now: datetime) -> float:
+    """``ln(count * e^(rate * t))`` for ``count`` views seen at ``now``."""
+    return math.log(count) + DECAY_RATE * (now - EPOCH).total_seconds() / 3600
+
+
+def add_weight(popularity, weight):
+    # ln(e^p + e^w) без переполнения
+    return case((popularity > weight, popularity), else_=weight) \
+        + func.ln(1 + func.exp(-func.abs(popularity - weight)))
+
+
+class ViewCounter:
+    """Per-product view counts aggregated in memory and written in one batch per flush.
+
+    ``add`` only touches a dict, so the request path never waits on the database.
+    """
+
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self._counts: dict[int, int] = {}
+        self._task: asyncio.Task | None = None
+
+    def add(self, product_id: int) -> None:
+        self._counts[product_id] = self._counts.get(product_id, 0) + 1
+
+    async def flush(self) -> int:
+        if not self._counts:
+            return 0
+        pending, self._counts = self._counts, {}
+        now = datetime.now(timezone.utc)
+        # Сортировка по id: параллельные воркеры блокируют строки в одном порядке
+        weights = [(product_id, count, view_weight(count, now)) for product_id, count in sorted(pending.items())]
+        try:
+            async with session_maker() as session:
+                await write_views(session, weights)
+                await session.commit()
+        except BaseException:
+            # Возвращаем счётчики в буфер (в том числе при отмене задачи), запишем при следующем сбросе
+            for product_id, count in pending.items():
+                self._counts[product_id] = self._counts.get(product_id, 0) + count
+            raise
+        return len(weights)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to flush product views')
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Записать не удалось, а процесс завершается: хотя бы сохраняем счётчики в логе
+            lost, self._counts = self._counts, {}
+            logger.exception('Failed to write %s product view counts on shutdown: %r',
+                             sum(lost.values()), lost)
+
+
+async def write_views(session: AsyncSession, weights: list[tuple[int, int, float]]) -> None:
+    # version и updated_at не трогаем: просмотры не меняют товар и не должны сбрасывать ETag
+    unchanged = dict(version=Product.version, updated_at=Product.updated_at)
+    if session.bind.dialect.name == 'postgresql':
+        batch = values(column('id', Integer), column('views', Integer), column('weight', Float),
+                       name='batch').data(weights)
+        await session.execute(
+            update(Product)
+            .where(Product.id == batch.c.id)
+            .values(views=Product.views + batch.c.views,
+                    popularity=add_weight(Product.popularity, batch.c.weight),
+                    **unchanged)
+            .execution_options(synchronize_session=False)
+        )
+        return
+    # UPDATE ... FROM (VALUES ...) с именами колонок есть не везде, здесь executemany
+    await session.execute(
+        update(Product.__table__)
+        .where(Product.id == bindparam('product_id'))
+        .values(views=Product.views + bindparam('count'),
+                popularity=add_weight(Product.popularity, bindparam('weight')),
+                **unchanged),
+        [dict(product_id=product_id, count=count, weight=weight) for product_id, count, weight in weights]
+    )
+
+
+view_counter = ViewCounter(config.popularity.flush_interval)
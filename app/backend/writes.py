@@ -0,0 +1,77 @@
+from typing import Any
+
+from fastapi import HTTPException
+from slugify import slugify
+from sqlalchemy import ColumnElement, Integer, String, case, cast, exists, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from starlette import status
+
+# Сколько раз повторяем запись, если параллельный запрос занял тот же slug
+SLUG_ATTEMPTS = 5
+# Длиннее - это часть имени ("Cable 20230101123"), а не суффикс; к тому же CAST в Integer переполнится
+SUFFIX_DIGITS = 9
+
+
+def dialect_insert(session: AsyncSession, model):
+    """``insert()`` of the session's dialect, so ``on_conflict_do_nothing`` is available."""
+    if session.bind.dialect.name == 'sqlite':
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def unique_slug(model, name: str, exclude_self: bool = False) -> ColumnElement[str]:
+    """SQL expression for ``slugify(name)``, or ``slug-N`` with the next free N if it is taken.
+
+    The slug is chosen inside the INSERT/UPDATE itself. With ``exclude_self`` (UPDATE only)
+    a row whose slug already fits the name keeps it and does not count as a conflict.
+    A name with nothing to slugify ("!!!") falls back to the model name: ``product``, ``product-2``.
+    """
+    base = slugify(name) or slugify(model.__name__)
+    other = aliased(model)
+    others = [other.id != model.id] if exclude_self else []
+    taken = exists().where(other.slug == base, *others)
+    max_suffix = (
+        select(func.max(cast(func.substr(other.slug, len(base) + 2), Integer)))
+        .where(other.slug.startswith(f'{base}-', autoescape=True),
+               other.slug.regexp_match(f'^{base}-[0-9]{{1,{SUFFIX_DIGITS}}}$'),
+               *others)
+        .scalar_subquery()
+    )
+    keep = [(model.slug.regexp_match(f'^{base}(-[0-9]+)?$'), model.slug)] if exclude_self else []
+    return case(
+        *keep,
+        (~taken, literal(base)),
+        else_=literal(f'{base}-') + cast(func.coalesce(max_suffix, 1) + 1, String)
+    )
+
+
+async def insert_with_slug(session: AsyncSession, model, values: dict[str, Any], name: str,
+                           guard: ColumnElement[bool] | None = None, returning=None) -> Row | None:
+    """Insert a row with a unique slug in one ``INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING``.
+
+    ``guard`` is a boolean SQL condition (e.g. that the referenced category exists); if it
+    is false nothing is inserted and None is returned. Losing a slug race retries the insert.
+    """
+    columns = model.__table__.c
+    selected = [literal(value, columns[key].type).label(key) for key, value in values.items()]
+    for _ in range(SLUG_ATTEMPTS):
+        source = select(*selected, unique_slug(model, name).label('slug'))
+        if guard is not None:
+            source = source.where(guard)
+        statement = (
+            dialect_insert(session, model)
+            .from_select([*values, 'slug'], source)
+            .on_conflict_do_nothing(index_elements=['slug'])
+            .returning(*(returning or (model.id, model.slug)))
+        )
+        row = (await session.execute(statement)).first()
+        if row is not None:
+            return row
+        if guard is not None and not await session.scalar(
+                select(guard).execution_options(include_inactive=True)):
+            return None
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                        detail='Could not generate a unique slug, try again')
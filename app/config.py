@@ -5,7 +5,11 @@ from environs import Env
 
 @dataclass
 class Site:
-    postgres: str
+    postgres: str | None
+    count_queries: bool = False
+    # 'postgres' или 'sqlite' (aiosqlite, схема создаётся через create_all)
+    backend: str = 'postgres'
+    sqlite_path: str = ':memory:'
 
 
 @dataclass
@@ -14,19 +18,87 @@ class JwtAuth:
     algorithm: str
 
 
+@dataclass
+class Media:
+    root: str
+    max_upload_bytes: int
+    workers: int
+
+
+@dataclass
+class Compression:
+    minimum_size: int
+    gzip_level: int
+    brotli_quality: int
+
+
+@dataclass
+class Popularity:
+    flush_interval: float
+    half_life_hours: float
+
+
+@dataclass
+class Audit:
+    buffer_size: int
+    batch_size: int
+    flush_interval: float
+
+
+@dataclass
+class Currency:
+    base: str
+    rates_file: str | None
+    refresh_interval: float
+
+
 @dataclass
 class Config:
     site: Site
     jwt_auth: JwtAuth
+    media: Media
+    compression: Compression
+    popularity: Popularity
+    audit: Audit
+    currency: Currency
 
 
 def load_config():
     env = Env()
     env.read_env()
     return Config(
-        site=Site(env('DB_POSTGRES')),
+        site=Site(
+            postgres=env('DB_POSTGRES', None),
+            count_queries=env.bool('DB_COUNT_QUERIES', False),
+            backend=env('DB_BACKEND', 'postgres'),
+            sqlite_path=env('DB_SQLITE_PATH', ':memory:')
+        ),
         jwt_auth=JwtAuth(
             secret_key=env('SECRET_KEY_JWT'),
             algorithm=env("ALGORYTHM_JWT")
+        ),
+        media=Media(
+            root=env('MEDIA_ROOT', 'media'),
+            max_upload_bytes=env.int('MEDIA_MAX_UPLOAD_BYTES', 10 * 1024 * 1024),
+            workers=env.int('MEDIA_WORKERS', 2)
+        ),
+        compression=Compression(
+            minimum_size=env.int('COMPRESSION_MIN_SIZE', 1024),
+            gzip_level=env.int('COMPRESSION_GZIP_LEVEL', 6),
+            brotli_quality=env.int('COMPRESSION_BROTLI_QUALITY', 5)
+        ),
+        popularity=Popularity(
+            flush_interval=env.float('POPULARITY_FLUSH_INTERVAL', 10.0),
+            half_life_hours=env.float('POPULARITY_HALF_LIFE_HOURS', 72.0)
+        ),
+        audit=Audit(
+            buffer_size=env.int('AUDIT_BUFFER_SIZE', 10000),
+            batch_size=env.int('AUDIT_BATCH_SIZE', 500),
+            flush_interval=env.float('AUDIT_FLUSH_INTERVAL', 1.0)
+        ),
+        currency=Currency(
+            base=env('CURRENCY_BASE', 'RUB'),
+            rates_file=env('CURRENCY_RATES_FILE', None),
+            refresh_interval=env.float('CURRENCY_REFRESH_INTERVAL', 60.0)
         )
     )
@@ -1,7 +1,56 @@
-from fastapi import FastAPI
-from app.routers import category, products, auth, permissions, reviews
+from contextlib import AsyncExitStack, asynccontextmanager
 
-app = FastAPI()
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+
+from app.backend.audit import audit_log
+from app.backend.compression import CompressionMiddleware
+from app.backend.currency import start_rates, stop_rates
+from app.backend.db import count_queries
+from app.backend.fixtures import create_schema
+from app.backend.images import shutdown_executor
+from app.backend.views import view_counter
+from app.config import load_config
+from app.routers import category, products, auth, permissions, reviews, suppliers, images, audit, currency
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.site.backend == 'sqlite':
+        await create_schema()
+    # Шаги остановки выполняются в обратном порядке и все, даже если какой-то из них упал
+    async with AsyncExitStack() as stack:
+        stack.callback(shutdown_executor)
+        await start_rates()
+        stack.push_async_callback(stop_rates)
+        view_counter.start()
+        stack.push_async_callback(view_counter.stop)
+        audit_log.start()
+        stack.push_async_callback(audit_log.stop)
+        yield
+
+
+config = load_config()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware,
+                   minimum_size=config.compression.minimum_size,
+                   gzip_level=config.compression.gzip_level,
+                   brotli_quality=config.compression.brotli_quality)
+
+if config.site.count_queries:
+    @app.middleware('http')
+    async def query_count_header(request: Request, call_next):
+        # Для тестов и профилирования: сколько SQL-запросов сделал эндпоинт до начала ответа
+        with count_queries() as queries:
+            response = await call_next(request)
+        response.headers['X-Query-Count'] = str(len(queries))
+        return response
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT,
+                        content={'detail': 'Request conflicts with existing data'})
 
 @app.get("/")
 async def welcome() -> dict:
@@ -11,4 +60,8 @@ app.include_router(category.router)
 app.include_router(products.router)
 app.include_router(auth.router)
 app.include_router(permissions.router)
-app.include_router(reviews.router)
\ No newline at end of file
+app.include_router(reviews.router)
+app.include_router(suppliers.router)
+app.include_router(images.router)
+app.include_router(audit.router)
+app.include_router(currency.router)
\ No newline at end of file
@@ -26,6 +26,10 @@ from app.models.products import Product
 from app.models.category import Category
 from app.models.user import User
 from app.models.review import Review
+from app.models.archive import ARCHIVE_TABLES
+from app.models.recommendation import Recommendation
+from app.models.audit import AuditLog
+from app.models.currency import ExchangeRate
 target_metadata = Base.metadata
 
 config_site = load_config()
@@ -0,0 +1,33 @@
+"""add row versions
+
+Revision ID: b71e0a94c5d2
+Revises: 3f9b2c7d41e8
+Create Date: 2025-05-27 10:36:51.604217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e0a94c5d2'
+down_revision: Union[str, None] = '3f9b2c7d41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('categories', 'products', 'reviews'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True),
+                                       server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('reviews', 'products', 'categories'):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
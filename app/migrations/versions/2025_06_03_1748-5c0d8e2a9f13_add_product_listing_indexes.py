@@ -0,0 +1,35 @@
+"""add product listing indexes
+
+Revision ID: 5c0d8e2a9f13
+Revises: b71e0a94c5d2
+Create Date: 2025-06-03 17:48:22.917340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0d8e2a9f13'
+down_revision: Union[str, None] = 'b71e0a94c5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в products, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_category_price', 'products', ['category_id', 'price', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_products_category_rating', 'products', ['category_id', 'rating', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_category_rating', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_category_price', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,96 @@
+"""add archive tables
+
+Revision ID: 8ad4f61e07b9
+Revises: 5c0d8e2a9f13
+Create Date: 2025-06-10 11:21:40.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8ad4f61e07b9'
+down_revision: Union[str, None] = '5c0d8e2a9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def versioned_columns() -> list[sa.Column]:
+    return [
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True),
+                                     server_default=sa.text('now()'), nullable=False))
+    # Частичные индексы: архивация ищет только неактивные строки
+    for table in ('categories', 'products', 'reviews', 'users'):
+        op.create_index(f'ix_{table}_inactive_updated_at', table, ['updated_at'], unique=False,
+                        postgresql_where=sa.text('NOT is_active'))
+
+    op.create_table('reviews_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.String(), nullable=True),
+    sa.Column('comment_date', sa.DateTime(), nullable=False),
+    sa.Column('grade', sa.Integer(), nullable=False),
+    *versioned_columns(),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('products_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    *versioned_columns(),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('categories_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    *versioned_columns(),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('first_name', sa.String(), nullable=False),
+    sa.Column('last_name', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.Column('is_supplier', sa.Boolean(), nullable=False),
+    sa.Column('is_customer', sa.Boolean(), nullable=False),
+    *versioned_columns(),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('users_archive')
+    op.drop_table('categories_archive')
+    op.drop_table('products_archive')
+    op.drop_table('reviews_archive')
+    for table in ('categories', 'products', 'reviews', 'users'):
+        op.drop_index(f'ix_{table}_inactive_updated_at', table_name=table)
+    op.drop_column('users', 'updated_at')
+    op.drop_column('users', 'version')
@@ -0,0 +1,38 @@
+"""add sort key listing indexes
+
+Revision ID: 7e3a9c5d1b86
+Revises: 4d7f0b9e2c61
+Create Date: 2025-07-15 10:24:51.382604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9c5d1b86'
+down_revision: Union[str, None] = '4d7f0b9e2c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в products, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_active_price', 'products', ['price', 'id'], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_products_active_rating', 'products', ['rating', 'id'], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_products_active_popularity', 'products', ['popularity', 'id'], unique=False,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_active_popularity', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_active_rating', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_active_price', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, Index, Table, func
+
+from app.backend.db import Base
+from .category import Category
+from .products import Product
+from .review import Review
+from .user import User
+
+
+def archive_table(model) -> Table:
+    """``<table>_archive`` with the model's columns, no foreign keys and an archived_at stamp."""
+    source = model.__table__
+    return Table(
+        f'{source.name}_archive', Base.metadata,
+        *(Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable,
+                 autoincrement=False)
+          for column in source.columns),
+        Column('archived_at', DateTime(timezone=True), server_default=func.now(), nullable=False),
+    )
+
+
+ARCHIVE_TABLES = {model: archive_table(model) for model in (Review, Product, Category, User)}
+
+# Архивация выбирает неактивные строки по updated_at, частичный индекс покрывает только их
+for model in ARCHIVE_TABLES:
+    Index(f'ix_{model.__tablename__}_inactive_updated_at', model.updated_at,
+          postgresql_where=model.is_active == False)
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.backend.db import Base
+
+
+class AuditLog(Base):
+    # В Postgres таблица секционирована по месяцам (RANGE по created_at), поэтому created_at
+    # входит в первичный ключ. Секции создаёт app.backend.audit перед записью
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        Index('ix_audit_log_actor_id', 'actor_id', 'created_at'),
+        Index('ix_audit_log_target', 'target_type', 'target_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    actor_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    actor: Mapped[str | None] = mapped_column(String, nullable=True)
+    action: Mapped[str] = mapped_column(String)
+    target_type: Mapped[str] = mapped_column(String)
+    target_id: Mapped[str] = mapped_column(String)
+    diff: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB, 'postgresql'), nullable=True)
@@ -3,22 +3,44 @@ from typing import List
 from sqlalchemy.orm import relationship, Mapped
 from sqlalchemy.testing.schema import mapped_column
 
-from app.backend.db import Base
-from sqlalchemy import Integer, String, Boolean, Float, ForeignKey
+from app.backend.db import Base, SoftDeleteMixin, VersionedMixin
+from app.config import load_config
+from sqlalchemy import BigInteger, Integer, String, Float, ForeignKey, Index, text
 from . import category
 
-class Product(Base):
+config = load_config()
+
+class Product(SoftDeleteMixin, VersionedMixin, Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        Index('ix_products_category_price', 'category_id', 'price', 'id'),
+        Index('ix_products_category_rating', 'category_id', 'rating', 'id'),
+        Index('ix_products_category_popularity', 'category_id', 'popularity', 'id'),
+        # Для листингов по нескольким категориям и без категории: страница идёт по индексу ключа
+        # сортировки от курсора. Условие совпадает с фильтром мягкого удаления в запросах
+        Index('ix_products_active_price', 'price', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_rating', 'rating', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_popularity', 'popularity', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String)
     slug: Mapped[str] = mapped_column(String, unique=True, index=True)
     description: Mapped[str] = mapped_column(String)
-    price: Mapped[int] = mapped_column(Integer)
+    # Цена в минимальных единицах валюты (копейки, центы), валюта - код ISO 4217.
+    # Без явной валюты - базовая валюта магазина (CURRENCY_BASE)
+    price: Mapped[int] = mapped_column(BigInteger)
+    currency: Mapped[str] = mapped_column(String(3), default=config.currency.base)
     image_url: Mapped[str] = mapped_column(String)
     stock: Mapped[int] = mapped_column(Integer)
     rating: Mapped[float] = mapped_column(Float)
-    supplier_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True) 
+    # Пишутся только app.backend.views пачками, см. ViewCounter
+    views: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+    popularity: Mapped[float] = mapped_column(Float, default=0.0, server_default='0')
+    supplier_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=True,
+                                             index=True)
     category_id: Mapped[int] = mapped_column(Integer, ForeignKey('categories.id'))
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     category: Mapped["category.Category"] = relationship('Category', back_populates='products')
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.backend.db import Base
+
+# Виды рекомендаций
+TOP_IN_CATEGORY = 1
+ALSO_REVIEWED = 2
+
+
+class Recommendation(Base):
+    # Производные данные, пересобираются целиком, поэтому без внешних ключей
+    __tablename__ = 'product_recommendations'
+
+    product_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    related_id: Mapped[int] = mapped_column(Integer)
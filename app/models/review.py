@@ -1,13 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Integer, String, DateTime, Boolean
+from sqlalchemy import ForeignKey, Integer, String, DateTime
 from sqlalchemy.orm import Mapped
 from sqlalchemy.testing.schema import mapped_column
 
-from app.backend.db import Base
+from app.backend.db import Base, SoftDeleteMixin, VersionedMixin
 
 
-class Review(Base):
+class Review(SoftDeleteMixin, VersionedMixin, Base):
     __tablename__='reviews'
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
@@ -15,4 +15,3 @@ class Review(Base):
     comment: Mapped[str] = mapped_column(String, nullable=True)
     comment_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     grade: Mapped[int] = mapped_column(Integer)
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -1,11 +1,11 @@
 from sqlalchemy.orm import Mapped
 from sqlalchemy.testing.schema import mapped_column
 
-from app.backend.db import Base
+from app.backend.db import Base, SoftDeleteMixin, VersionedMixin
 from sqlalchemy import Column, Integer, String, Boolean
 
 
-class User(Base):
+class User(SoftDeleteMixin, VersionedMixin, Base):
     __tablename__ = 'users'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -14,7 +14,6 @@ class User(Base):
     username: Mapped[str] = mapped_column(String, unique=True)
     email: Mapped[str] = mapped_column(String, unique=True)
     hashed_password: Mapped[str] = mapped_column(String)
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
     is_supplier: Mapped[bool] = mapped_column(Boolean, default=False)
     is_customer: Mapped[bool] = mapped_column(Boolean, default=True)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.backend.db_depends import get_db
+from app.models.audit import AuditLog
+from app.routers.auth import get_current_user
+from app.schemas import AuditOut
+
+router = APIRouter(prefix='/audit', tags=['audit'])
+
+
+def encode_cursor(entry: AuditLog) -> str:
+    payload = json.dumps([entry.created_at.isoformat(), str(entry.id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), UUID(entry_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail='Invalid cursor')
+
+
+@router.get('/', response_model=list[AuditOut])
+async def audit_entries(session: Annotated[AsyncSession, Depends(get_db)],
+                        get_user: Annotated[dict, Depends(get_current_user)],
+                        response: Response,
+                        actor_id: int | None = None,
+                        action: str | None = None,
+                        target_type: str | None = None,
+                        target_id: str | None = None,
+                        since: datetime | None = None,
+                        limit: Annotated[int, Query(ge=1, le=500)] = 50,
+                        cursor: str | None = None):
+    if not get_user.get('is_admin'):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have admin permission"
+        )
+    # Новые записи первыми; ключ (created_at, id) совпадает с первичным ключом, а условие
+    # на created_at позволяет Postgres не трогать лишние месячные секции
+    statement = select(AuditLog)
+    if actor_id is not None:
+        statement = statement.where(AuditLog.actor_id == actor_id)
+    if action is not None:
+        statement = statement.where(AuditLog.action == action)
+    if target_type is not None:
+        statement = statement.where(AuditLog.target_type == target_type)
+    if target_id is not None:
+        statement = statement.where(AuditLog.target_id == target_id)
+    if since is not None:
+        statement = statement.where(AuditLog.created_at >= since)
+    if cursor is not None:
+        statement = statement.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*decode_cursor(cursor)))
+    entries = (
+        await session.scalars(
+            statement
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(limit + 1)
+        )
+    ).all()
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers['X-Next-Cursor'] = encode_cursor(entries[-1])
+    return entries
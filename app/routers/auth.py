@@ -3,7 +3,7 @@ from datetime import timedelta, datetime, timezone
 import jwt
 from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import select, insert
+from sqlalchemy import select
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
@@ -11,6 +11,7 @@ from passlib.context import CryptContext
 from app.models.user import User
 from app.schemas import CreateUser
 from app.backend.db_depends import get_db
+from app.backend.writes import dialect_insert
 from app.config import load_config
 
 
@@ -115,11 +116,10 @@ async def read_current_user(user: dict = Depends(get_current_user)):
     return {'User': user}
 
 
-# Пользователь уже создан?
 @router.post('/', status_code=status.HTTP_201_CREATED)
 async def create_user(session: Annotated[AsyncSession, Depends(get_db)], create_user: CreateUser):
-    await session.execute(
-        insert(User)
+    user_id = await session.scalar(
+        dialect_insert(session, User)
         .values(
             first_name=create_user.first_name,
             last_name=create_user.last_name,
@@ -127,7 +127,14 @@ async def create_user(session: Annotated[AsyncSession, Depends(get_db)], create_
             email=create_user.email,
             hashed_password=bcrypt_context.hash(create_user.password)
         )
+        .on_conflict_do_nothing()
+        .returning(User.id)
     )
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='User with this username or email already exists'
+        )
     await session.commit()
     return {
         'status_code': status.HTTP_201_CREATED,
@@ -1,12 +1,15 @@
 from typing import Annotated
 
 from fastapi import APIRouter
-from fastapi import APIRouter, Depends, status, HTTPException
-from slugify import slugify
-from sqlalchemy import select, update
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response
+from sqlalchemy import select, update, func, exists, true
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.backend.audit import audit_log
+from app.backend.conditional import conditional_response, make_etag
 from app.backend.db_depends import get_db
+from app.backend.writes import insert_with_slug, unique_slug
 from app.models import Category
 from app.routers.auth import get_current_user
 from app.schemas import CreateCategory
@@ -14,28 +17,55 @@ from app.schemas import CreateCategory
 router = APIRouter(prefix='/categories', tags=['category'])
 
 @router.get('/')
-async def get_all_categories(session: Annotated[AsyncSession, Depends(get_db)]):
-    categories = await session.scalars(
-        select(Category)
-        .where(Category.is_active == True)
-    )
+async def get_all_categories(session: Annotated[AsyncSession, Depends(get_db)],
+                             request: Request, response: Response):
+    # Last-Modified считается и по удалённым категориям: удаление тоже меняет список
+    active = Category.is_active == True
+    version = (
+        await session.execute(
+            select(func.count(Category.id).filter(active),
+                   func.coalesce(func.sum(Category.version).filter(active), 0),
+                   func.max(Category.updated_at))
+            .execution_options(include_inactive=True)
+        )
+    ).one()
+    count, versions, last_modified = version
+    not_modified = conditional_response(request, response, make_etag('categories', count, versions, last_modified),
+                                        last_modified)
+    if not_modified is not None:
+        return not_modified
+    categories = await session.scalars(select(Category))
     return categories.all()
 
 
+def parent_exists(parent_id: int | None):
+    # Алиас нужен, чтобы подзапрос не скоррелировал с изменяемой строкой categories
+    if parent_id is None:
+        return true()
+    parent = aliased(Category)
+    return exists().where(parent.id == parent_id)
+
+
 @router.post('/', status_code=status.HTTP_201_CREATED)
 async def create_category(session: Annotated[AsyncSession, Depends(get_db)], create_category: CreateCategory,
                           get_user: Annotated[dict, Depends(get_current_user)]):
     if get_user.get('is_admin'):
-        category = Category(
-            name=create_category.name,
-            parent_id=create_category.parent_id,
-            slug=slugify(create_category.name)
+        category = await insert_with_slug(
+            session, Category,
+            dict(name=create_category.name, parent_id=create_category.parent_id),
+            create_category.name,
+            guard=parent_exists(create_category.parent_id)
         )
-        session.add(category)
+        if category is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='There is no parent category found'
+            )
         await session.commit()
         return {
             'status_code': status.HTTP_201_CREATED,
-            'transaction': 'Succesful'
+            'transaction': 'Succesful',
+            'slug': category.slug
         }
     else:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,17 +75,35 @@ async def create_category(session: Annotated[AsyncSession, Depends(get_db)], cre
 async def update_category(session: Annotated[AsyncSession, Depends(get_db)], category_slug: str,
                           update_category: CreateCategory, get_user: Annotated[dict, Depends(get_current_user)]):
     if get_user.get('is_admin'):
-        category = await session.scalar(select(Category).where(Category.slug == category_slug))
-        if category is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='There is no category found'
-            )
-
-        await session.execute(update(Category).where(Category.slug == category_slug).values(
+        guard = parent_exists(update_category.parent_id)
+        category_id = await session.scalar(
+            update(Category)
+            .where(Category.slug == category_slug, guard)
+            .values(
                 name=update_category.name,
-                slug=slugify(update_category.name),
-                parent_id=update_category.parent_id))
+                slug=unique_slug(Category, update_category.name, exclude_self=True),
+                parent_id=update_category.parent_id)
+            .returning(Category.id)
+        )
+        if category_id is None:
+            found, has_parent = (
+                await session.execute(
+                    select(exists().where(Category.slug == category_slug), guard)
+                    .execution_options(include_inactive=True)
+                )
+            ).one()
+            if not found:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='There is no category found'
+                )
+            if not has_parent:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail='There is no parent category found'
+                )
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail='Category was changed concurrently, try again')
         await session.commit()
         return {
             'status_code': status.HTTP_200_OK,
@@ -67,27 +115,27 @@ async def update_category(session: Annotated[AsyncSession, Depends(get_db)], cat
                             detail='You must be admin user for this')
 
 
-
-
-
 @router.delete('/{category_slug}')
 async def delete_category(session: Annotated[AsyncSession, Depends(get_db)], category_slug: str,
                           get_user: Annotated[dict, Depends(get_current_user)]):
     if get_user.get('is_admin'):
-        category = await session.scalar(select(Category).where(Category.slug == category_slug,
-                                                               Category.is_active == True))
-        if category is None:
+        category_id = await session.scalar(
+            update(Category)
+            .where(Category.slug == category_slug, Category.is_active == True)
+            .values(is_active=False)
+            .returning(Category.id)
+        )
+        if category_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='There is no category found!'
             )
-        await session.execute(update(Category).where(Category.slug == category_slug).values(is_active=False))
         await session.commit()
+        await audit_log.record(get_user, 'delete', 'category', category_id,
+                               {'slug': category_slug, 'is_active': False})
 
         return {'status_code': status.HTTP_200_OK,
                 'transaction': 'Category delete is successful'}
     else:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail='You must be admin user for this')
-
-
@@ -0,0 +1,64 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.backend.audit import audit_log
+from app.backend.currency import get_rates, invalid_rates, read_rates_file, save_rates
+from app.backend.db_depends import get_db
+from app.config import load_config
+from app.routers.auth import get_current_user
+from app.schemas import UpdateRates
+
+router = APIRouter(prefix='/currency', tags=['currency'])
+config = load_config()
+
+
+@router.get('/rates')
+async def exchange_rates():
+    snapshot = get_rates()
+    return {'base': snapshot.base, 'rates': snapshot.rates, 'loaded_at': snapshot.loaded_at}
+
+
+def check_admin(get_user: dict):
+    if not get_user.get('is_admin'):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have admin permission"
+        )
+
+
+@router.put('/rates')
+async def update_rates(session: Annotated[AsyncSession, Depends(get_db)],
+                       get_user: Annotated[dict, Depends(get_current_user)],
+                       update_rates: UpdateRates):
+    check_admin(get_user)
+    invalid = invalid_rates(update_rates.rates)
+    if invalid:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f'Invalid rates for {", ".join(invalid)}')
+    snapshot = await save_rates(session, update_rates.rates)
+    await audit_log.record(get_user, 'update_rates', 'exchange_rates', snapshot.base, update_rates.rates)
+    return {'status_code': status.HTTP_200_OK,
+            'transaction': 'Rates update is successful',
+            'rates': snapshot.rates}
+
+
+@router.post('/rates/reload')
+async def reload_rates(session: Annotated[AsyncSession, Depends(get_db)],
+                       get_user: Annotated[dict, Depends(get_current_user)]):
+    check_admin(get_user)
+    if not config.currency.rates_file:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='CURRENCY_RATES_FILE is not configured')
+    try:
+        rates = read_rates_file(config.currency.rates_file)
+    except (OSError, ValueError, KeyError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f'Could not read rates file: {exc}')
+    snapshot = await save_rates(session, rates)
+    await audit_log.record(get_user, 'reload_rates', 'exchange_rates', snapshot.base, rates)
+    return {'status_code': status.HTTP_200_OK,
+            'transaction': 'Rates reload is successful',
+            'rates': snapshot.rates}
@@ -0,0 +1,57 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from starlette import status
+
+from app.backend.images import (DIGEST_RE, FILENAME_RE, MEDIA_TYPES, config, image_path, save_upload,
+                                variant_urls)
+from app.routers.auth import get_current_user
+
+router = APIRouter(prefix='/images', tags=['images'])
+
+# Файлы адресуются по содержимому и никогда не меняются
+CACHE_HEADERS = {'Cache-Control': 'public, max-age=31536000, immutable'}
+
+
+@router.post('/', status_code=status.HTTP_201_CREATED)
+async def upload_image(get_user: Annotated[dict, Depends(get_current_user)], file: UploadFile):
+    if not (get_user.get('is_admin') or get_user.get('is_supplier')):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to use this method"
+        )
+    data = await file.read(config.media.max_upload_bytes + 1)
+    if len(data) > config.media.max_upload_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail='Image is too large'
+        )
+    try:
+        digest, ext = await save_upload(data)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(exc)
+        )
+    urls = variant_urls(digest, ext)
+    return {
+        'status_code': status.HTTP_201_CREATED,
+        'digest': digest,
+        'image_url': urls['original'],
+        'variants': urls
+    }
+
+
+@router.get('/{digest}/{filename}')
+async def get_image(digest: str, filename: str):
+    match = FILENAME_RE.match(filename)
+    if not DIGEST_RE.match(digest) or match is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='Image not found')
+    path = image_path(digest, filename)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='Image not found')
+    # FileResponse отдаёт файл через sendfile/pathsend, если сервер это поддерживает
+    return FileResponse(path, media_type=MEDIA_TYPES[match.group(2)], headers=CACHE_HEADERS)
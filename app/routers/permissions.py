@@ -1,9 +1,10 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, update
+from sqlalchemy import update
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.backend.audit import audit_log
 from app.backend.db_depends import get_db
 from app.models.user import User
 from .auth import get_current_user
@@ -14,7 +15,7 @@ router = APIRouter(prefix='/permission', tags=['permission'])
 async def supplier_permission(db: Annotated[AsyncSession, Depends(get_db)], get_user: Annotated[dict, Depends(get_current_user)],
                           user_id: int):
     if get_user.get('is_admin'):
-        user = await db.scalar(select(User).where(User.id == user_id))
+        user = await db.get(User, user_id)
 
         if not user or not user.is_active:
             raise HTTPException(
@@ -24,6 +25,8 @@ async def supplier_permission(db: Annotated[AsyncSession, Depends(get_db)], get_
         if user.is_supplier:
             await db.execute(update(User).where(User.id == user_id).values(is_supplier=False, is_customer=True))
             await db.commit()
+            await audit_log.record(get_user, 'supplier_permission', 'user', user_id,
+                                   {'is_supplier': False, 'is_customer': True})
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is no longer supplier'
@@ -31,6 +34,8 @@ async def supplier_permission(db: Annotated[AsyncSession, Depends(get_db)], get_
         else:
             await db.execute(update(User).where(User.id == user_id).values(is_supplier=True, is_customer=False))
             await db.commit()
+            await audit_log.record(get_user, 'supplier_permission', 'user', user_id,
+                                   {'is_supplier': True, 'is_customer': False})
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is now supplier'
@@ -1,35 +1,52 @@
-from http.client import HTTPException
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from slugify import slugify
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, exists, true, or_
+from sqlalchemy.orm import aliased
 from starlette import status
 
+from app.backend.audit import audit_log
+from app.backend.cache import supplier_cache
+from app.backend.conditional import conditional_response, make_etag
+from app.backend.currency import check_currency, convert_prices, get_rates
+from app.backend.db import session_maker, unindexed
 from app.backend.db_depends import get_db
+from app.backend.listing import SORT_KEYS, filter_products, split_page
+from app.backend.streaming import stream_json_array
+from app.backend.views import view_counter
+from app.backend.writes import insert_with_slug, unique_slug
 from app.models import Product, Category
+from app.models.recommendation import ALSO_REVIEWED, TOP_IN_CATEGORY, Recommendation
 from app.routers.auth import get_current_user
-from app.schemas import CreateProduct
+from app.schemas import CreateProduct, ProductFilter, ProductOut, RelatedProducts
 
 router = APIRouter(prefix='/products', tags=['products'])
 
 
-@router.get('/')
-async def all_products(session: Annotated[AsyncSession, Depends(get_db)]):
-    products = (
-        await session.scalars(
-            select(Product)
-            .join(Category)
-            .where(Product.is_active == True,
-                   Product.stock > 0,
-                   Category.is_active == True)
-        )
-    ).all()
-    if products is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail='There is not products found')
-    return products
+@router.get('/', response_model=list[ProductOut])
+async def all_products(params: Annotated[ProductFilter, Query()], response: Response):
+    statement = filter_products(
+        select(Product)
+        .join(Category),
+        params
+    )
+    if params.limit is None:
+        # Поток сам берёт соединение на каждую пачку, сессия запроса ему не нужна
+        key, descending = SORT_KEYS[params.sort]
+        return stream_json_array(statement, ProductOut, key, descending,
+                                 transform=partial(convert_prices, currency=params.currency))
+    async with session_maker() as session:
+        return await product_page(session, statement, params, response)
+
+
+async def product_page(session: AsyncSession, statement, params: ProductFilter, response: Response):
+    products, next_cursor = split_page((await session.scalars(statement)).all(), params)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+    # Цены всей страницы пересчитываются одним векторным проходом
+    return convert_prices(products, params.currency)
 
 
 @router.post('/', status_code=status.HTTP_201_CREATED)
@@ -37,27 +54,32 @@ async def create_product(session: Annotated[AsyncSession, Depends(get_db)],
                          get_user: Annotated[dict, Depends(get_current_user)],
                          create_product: CreateProduct):
     if get_user.get('is_admin') or get_user.get('is_supplier'):
-        category = await session.scalar(select(Category).where(Category.id == create_product.category))
-        if category is None:
+        product = await insert_with_slug(
+            session, Product,
+            dict(
+                name=create_product.name,
+                description=create_product.description,
+                price=create_product.price,
+                currency=check_currency(create_product.currency or get_rates().base),
+                image_url=create_product.image_url,
+                stock=create_product.stock,
+                rating=0.0,
+                category_id=create_product.category,
+                supplier_id=get_user.get('id')
+            ),
+            create_product.name,
+            guard=exists().where(Category.id == create_product.category)
+        )
+        if product is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='There is no category found'
             )
-        product = Product(
-            name=create_product.name,
-            slug=slugify(create_product.name),
-            description=create_product.description,
-            price=create_product.price,
-            image_url=create_product.image_url,
-            stock=create_product.stock,
-            rating=0.0,
-            category_id=create_product.category,
-            supplier_id=get_user.get('id')
-        )
-        session.add(product)
         await session.commit()
+        supplier_cache.invalidate(get_user.get('id'))
         return {'status_code': status.HTTP_201_CREATED,
-                'transaction': 'Successful'}
+                'transaction': 'Successful',
+                'slug': product.slug}
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -65,48 +87,110 @@ async def create_product(session: Annotated[AsyncSession, Depends(get_db)],
         )
 
 
-@router.get('/{category_slug}')
-async def product_by_category(session: Annotated[AsyncSession, Depends(get_db)], category_slug: str):
-    category = (
-        await session.scalar(
-            select(Category)
-            .where(Category.slug == category_slug)
-        )
-    )
-    if category is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail='Category not found')
-    subcategories = (
+@router.get('/{category_slug}', response_model=list[ProductOut])
+async def product_by_category(session: Annotated[AsyncSession, Depends(get_db)], category_slug: str,
+                              params: Annotated[ProductFilter, Query()], response: Response):
+    parent = select(Category.id).where(Category.slug == category_slug).scalar_subquery()
+    categories_and_subcategories = (
         await session.scalars(
-            select(Category)
-            .where(Category.parent_id == category.id)
+            select(Category.id)
+            .where(or_(Category.slug == category_slug, Category.parent_id == parent))
         )
     ).all()
+    if not categories_and_subcategories:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='Category not found')
 
-    categories_and_subcategories = [category.id] + [x.id for x in subcategories]
-
-    product_category = await session.scalars(
+    # Одну категорию ищем по (category_id, ключ сортировки, id), поддерево - по индексу ключа сортировки
+    category_id = Product.category_id if len(categories_and_subcategories) == 1 else unindexed(Product.category_id)
+    statement = filter_products(
         select(Product)
-        .where(
-            Product.category_id.in_(categories_and_subcategories),
-            Product.is_active == True,
-            Product.stock > 0
-        )
+        .where(category_id.in_(categories_and_subcategories)),
+        params
     )
-    return product_category.all()
+    return await product_page(session, statement, params, response)
 
 
+@router.get('/detail/{product_slug}', response_model=ProductOut)
+async def product_detail(session: Annotated[AsyncSession, Depends(get_db)], product_slug: str,
+                         request: Request, response: Response):
+    version = (
+        await session.execute(
+            select(Product.id, Product.version, Product.updated_at)
+            .where(Product.slug == product_slug, Product.stock > 0)
+        )
+    ).one_or_none()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='There are no product'
+        )
+    not_modified = conditional_response(request, response, make_etag('product', version.id, version.version),
+                                        version.updated_at)
+    if not_modified is not None:
+        return not_modified
+    # Ревалидация кэша (304) просмотром не считается
+    view_counter.add(version.id)
+    return await session.get(Product, version.id)
+
 
-@router.get('/detail/{product_slug}')
-async def product_detail(session: Annotated[AsyncSession, Depends(get_db)], product_slug: str):
-    product = await session.scalar(
-        select(Product).where(Product.slug == product_slug, Product.is_active == True, Product.stock > 0))
-    if not product:
+@router.get('/detail/{product_slug}/related', response_model=RelatedProducts)
+async def related_products(session: Annotated[AsyncSession, Depends(get_db)], product_slug: str):
+    # Списки заранее посчитаны app.backend.recommendations, здесь одно чтение по первичному ключу
+    related = aliased(Product)
+    rows = (
+        await session.execute(
+            select(Recommendation.kind, related)
+            .select_from(Product)
+            .outerjoin(Recommendation, Recommendation.product_id == Product.id)
+            .outerjoin(related, (related.id == Recommendation.related_id) & (related.stock > 0))
+            .where(Product.slug == product_slug)
+            .order_by(Recommendation.kind, Recommendation.rank)
+        )
+    ).all()
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='There are no product'
         )
-    return product
+    lists = {TOP_IN_CATEGORY: [], ALSO_REVIEWED: []}
+    for kind, product in rows:
+        if product is not None:
+            lists[kind].append(product)
+    return RelatedProducts(top_in_category=lists[TOP_IN_CATEGORY], also_reviewed=lists[ALSO_REVIEWED])
+
+
+def owned_by(get_user: dict):
+    if get_user.get('is_admin'):
+        return true()
+    return Product.supplier_id == get_user.get('id')
+
+
+async def raise_write_error(session: AsyncSession, get_user: dict, product_slug: str,
+                            category_id: int | None = None):
+    # Сюда попадаем только если UPDATE ничего не изменил: выясняем причину одним запросом
+    category_exists = exists().where(Category.id == category_id) if category_id is not None else true()
+    row = (
+        await session.execute(
+            select(Product.supplier_id, category_exists)
+            .where(Product.slug == product_slug)
+            .execution_options(include_inactive=True)
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='There is not product found')
+    supplier_id, has_category = row
+    if not get_user.get('is_admin') and supplier_id != get_user.get('id'):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to use this method"
+        )
+    if not has_category:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='There is no category found')
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                        detail='Product was changed concurrently, try again')
 
 
 @router.put("/{product_slug}")
@@ -114,66 +198,64 @@ async def update_product(session: Annotated[AsyncSession, Depends(get_db)],
                          get_user: Annotated[dict, Depends(get_current_user)],
                          product_slug: str,
                          product_update: CreateProduct):
-    product = await session.scalar(
-        select(Product)
-        .where(Product.slug == product_slug)
-    )
-    if get_user.get('is_admin') or \
-        (get_user.get('is_supplier') and get_user.get('id') == product.supplier_id):
-        product = await session.scalar(
-            select(Product)
-            .where(Product.slug == product_slug)
-        )
-        if product is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail='There is not product found')
-        category = await session.scalar(
-            select(Category)
-            .where(Category.id == product_update.category)
-        )
-        if category is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail='There is no category found')
-
-        product.name = product_update.name
-        product.slug = slugify(product_update.name)
-        product.description = product_update.description
-        product.price = product_update.price
-        product.image_url = product_update.image_url
-        product.stock = product_update.stock
-        product.category_id = product_update.category
-        await session.commit()
-
-        return {'status_code': status.HTTP_200_OK,
-                'transaction': 'Product update is successful'}
-    else:
+    if not (get_user.get('is_admin') or get_user.get('is_supplier')):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to use this method"
         )
+    # Права, существование категории и новый slug проверяются в одном UPDATE
+    product = (
+        await session.execute(
+            update(Product)
+            .where(Product.slug == product_slug,
+                   owned_by(get_user),
+                   exists().where(Category.id == product_update.category))
+            .values(
+                name=product_update.name,
+                slug=unique_slug(Product, product_update.name, exclude_self=True),
+                description=product_update.description,
+                price=product_update.price,
+                currency=check_currency(product_update.currency or get_rates().base),
+                image_url=product_update.image_url,
+                stock=product_update.stock,
+                category_id=product_update.category
+            )
+            .returning(Product.id, Product.supplier_id)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    if product is None:
+        await raise_write_error(session, get_user, product_slug, product_update.category)
+    await session.commit()
+    supplier_cache.invalidate(product.supplier_id)
 
+    return {'status_code': status.HTTP_200_OK,
+            'transaction': 'Product update is successful'}
 
 
 @router.delete("/{product_slug}")
 async def delete_product(session: Annotated[AsyncSession, Depends(get_db)],
                          get_user: Annotated[dict, Depends(get_current_user)],
                          product_slug: str):
-    product = await session.scalar(
-        select(Product)
-        .where(Product.slug == product_slug)
-    )
-    if get_user.get('is_admin') or \
-            (get_user.get('is_supplier') and get_user.get('id') == product.supplier_id):
-        if product is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail='There is not product found')
-        product.is_active = False
-        await session.commit()
-        return {'status_code': status.HTTP_200_OK,
-                'transaction': 'Product delete is successful'}
-    else:
+    if not (get_user.get('is_admin') or get_user.get('is_supplier')):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to use this method"
         )
-
+    product = (
+        await session.execute(
+            update(Product)
+            .where(Product.slug == product_slug, owned_by(get_user))
+            .values(is_active=False)
+            .returning(Product.id, Product.supplier_id)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    if product is None:
+        await raise_write_error(session, get_user, product_slug)
+    await session.commit()
+    supplier_cache.invalidate(product.supplier_id)
+    await audit_log.record(get_user, 'delete', 'product', product.id,
+                           {'slug': product_slug, 'is_active': False})
+    return {'status_code': status.HTTP_200_OK,
+            'transaction': 'Product delete is successful'}
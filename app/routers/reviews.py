@@ -1,52 +1,64 @@
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.params import Depends
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.backend.audit import audit_log
+from app.backend.cache import supplier_cache
+from app.backend.conditional import conditional_response, make_etag
 from app.backend.db_depends import get_db
+from app.backend.streaming import stream_json_array
 from app.models import Product
 from app.models.review import Review
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.schemas import CreateReview
+from app.schemas import CreateReview, ReviewOut
 
 router = APIRouter(prefix='/review', tags=['review'])
 
-@router.get("/")
-async def all_reviews(session: Annotated[AsyncSession, Depends(get_db)]):
-    reviews = (
-        await session.scalars(
-            select(Review)
-            .join(Product)
-            .join(User)
-            .where(Review.is_active == True,
-                   Product.is_active == True,
-                   User.is_active == True)
-        )
-    ).all()
-    if reviews is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail='There is not reviews found')
-    return reviews
+@router.get("/", response_model=list[ReviewOut])
+async def all_reviews():
+    return stream_json_array(
+        select(Review)
+        .join(Product)
+        .join(User)
+        .order_by(Review.id),
+        ReviewOut,
+        (Review.id,)
+    )
 
 @router.get("/{product_slug}")
 async def products_reviews(session: Annotated[AsyncSession, Depends(get_db)],
-                             product_slug: str):
-    product = await session.scalar(
-        select(Product)
-        .where(Product.slug == product_slug,
-               Product.is_active == True)
-    )
-    if product is None:
+                             product_slug: str, request: Request, response: Response):
+    # Удалённые отзывы учитываются в Last-Modified, иначе после удаления клиент получит 304
+    active = Review.is_active == True
+    version = (
+        await session.execute(
+            select(Product.id, func.count(Review.id).filter(active),
+                   func.coalesce(func.sum(Review.version).filter(active), 0),
+                   func.max(Review.updated_at))
+            .outerjoin(Review, Review.product_id == Product.id)
+            .where(Product.slug == product_slug, Product.is_active == True)
+            .group_by(Product.id)
+            .execution_options(include_inactive=True)
+        )
+    ).one_or_none()
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail='Product not found')
+    product_id, count, versions, last_modified = version
+    not_modified = conditional_response(request, response,
+                                        make_etag('reviews', product_id, count, versions, last_modified),
+                                        last_modified)
+    if not_modified is not None:
+        return not_modified
     reviews = (
         await session.scalars(
         select(Review)
-        .where(Review.product_id == product.id)
+        .where(Review.product_id == product_id)
         )
     ).all()
 
@@ -62,7 +74,7 @@ async def create_review(session: Annotated[AsyncSession, Depends(get_db)],
                         create_review: CreateReview):
     if get_user.get('is_supplier'):
 
-        product = await session.scalar(select(Product).where(Product.id == create_review.product_id))
+        product = await session.get(Product, create_review.product_id)
         if product is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -78,15 +90,15 @@ async def create_review(session: Annotated[AsyncSession, Depends(get_db)],
         )
         session.add(review)
 
-        reviews = (
-            await session.scalars(
-                select(Review)
-                .where(Review.product_id == create_review.product_id)
-            )
-        ).all()
-        product.rating = sum(review.grade for review in reviews) / len(reviews)
+        # Средняя оценка считается в базе, сами отзывы не загружаем
+        product.rating = await session.scalar(
+            select(func.avg(Review.grade))
+            .where(Review.product_id == create_review.product_id)
+        )
+        supplier_id = product.supplier_id
 
         await session.commit()
+        supplier_cache.invalidate(supplier_id)
         return {'status_code': status.HTTP_201_CREATED,
                 'transaction': 'Successful'}
     else:
@@ -100,10 +112,25 @@ async def delete_reviews(session: Annotated[AsyncSession, Depends(get_db)],
                          get_user: Annotated[dict, Depends(get_current_user)],
                          review_id: int):
     if get_user.get('is_admin'):
-        await session.execute(update(Review)
-                              .where(Review.id == review_id)
-                              .values(is_active=False))
+        review = (
+            await session.execute(
+                update(Review)
+                .where(Review.id == review_id)
+                .values(is_active=False)
+                .returning(
+                    Review.product_id,
+                    select(Product.supplier_id)
+                    .where(Product.id == Review.product_id)
+                    .scalar_subquery()
+                )
+            )
+        ).first()
         await session.commit()
+        if review is not None:
+            product_id, supplier_id = review
+            supplier_cache.invalidate(supplier_id)
+            await audit_log.record(get_user, 'delete', 'review', review_id,
+                                   {'product_id': product_id, 'is_active': False})
         return {'status_code': status.HTTP_200_OK,
             'transaction': 'Review delete is successful'}
     else:
@@ -0,0 +1,99 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.backend.cache import supplier_cache
+from app.backend.db_depends import get_db
+from app.models import Product
+from app.models.review import Review
+from app.routers.auth import get_current_user
+from app.schemas import ProductOut
+
+router = APIRouter(prefix='/suppliers', tags=['suppliers'])
+
+
+async def get_supplier(get_user: Annotated[dict, Depends(get_current_user)]) -> dict:
+    if not get_user.get('is_supplier'):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have supplier permission"
+        )
+    return get_user
+
+
+@router.get('/me/products')
+async def supplier_products(session: Annotated[AsyncSession, Depends(get_db)],
+                            get_user: Annotated[dict, Depends(get_supplier)],
+                            page: Annotated[int, Query(ge=1)] = 1,
+                            page_size: Annotated[int, Query(ge=1, le=100)] = 20):
+    supplier_id = get_user.get('id')
+    key = ('products', page, page_size)
+    cached = supplier_cache.get(supplier_id, key)
+    if cached is not None:
+        return cached
+
+    products = (
+        await session.scalars(
+            select(Product)
+            .where(Product.supplier_id == supplier_id)
+            .order_by(Product.id)
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+            .execution_options(include_inactive=True)
+        )
+    ).all()
+    result = {
+        'page': page,
+        'page_size': page_size,
+        'items': [ProductOut.model_validate(product).model_dump() for product in products]
+    }
+    supplier_cache.set(supplier_id, key, result)
+    return result
+
+
+@router.get('/me/stats')
+async def supplier_stats(session: Annotated[AsyncSession, Depends(get_db)],
+                         get_user: Annotated[dict, Depends(get_supplier)]):
+    supplier_id = get_user.get('id')
+    cached = supplier_cache.get(supplier_id, 'stats')
+    if cached is not None:
+        return cached
+
+    # Отзывы считаются заранее по товару, чтобы join не размножал строки products
+    review_counts = (
+        select(Review.product_id, func.count(Review.id).label('reviews'))
+        .join(Product, Product.id == Review.product_id)
+        .where(Review.is_active == True, Product.supplier_id == supplier_id)
+        .group_by(Review.product_id)
+        .subquery()
+    )
+    reviews = func.coalesce(review_counts.c.reviews, 0)
+    row = (
+        await session.execute(
+            select(
+                func.count(Product.id).filter(Product.is_active == True, Product.stock > 0).label('active'),
+                func.count(Product.id).filter(Product.is_active == True, Product.stock <= 0).label('out_of_stock'),
+                func.count(Product.id).filter(Product.is_active == False).label('inactive'),
+                func.avg(Product.rating).filter(Product.is_active == True, reviews > 0).label('average_rating'),
+                func.coalesce(func.sum(reviews), 0).label('reviews'),
+                func.count(Product.id).filter(reviews > 0).label('reviewed_products'),
+            )
+            .select_from(Product)
+            .outerjoin(review_counts, review_counts.c.product_id == Product.id)
+            .where(Product.supplier_id == supplier_id)
+            .execution_options(include_inactive=True)
+        )
+    ).one()
+    result = {
+        'active_products': row.active,
+        'out_of_stock_products': row.out_of_stock,
+        'inactive_products': row.inactive,
+        'average_rating': round(row.average_rating, 2) if row.average_rating is not None else None,
+        'review_count': row.reviews,
+        'reviewed_products': row.reviewed_products,
+    }
+    supplier_cache.set(supplier_id, 'stats', result)
+    return result
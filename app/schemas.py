@@ -1,9 +1,17 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+from app.backend.images import variants_from_url
 
 class CreateProduct(BaseModel):
     name: str
     description: str
-    price: int
+    # Без currency - базовая валюта магазина
+    price: int = Field(description='Price in minor units of the currency (kopecks, cents): 1500 RUB is 150000')
+    currency: str | None = Field(None, pattern='^[A-Z]{3}$')
     image_url: str
     stock: int
     category: int
@@ -23,4 +31,74 @@ class CreateReview(BaseModel):
     user_id: int
     product_id: int
     comment: str
-    rate_grade: int
\ No newline at end of file
+    rate_grade: int
+
+class ProductFilter(BaseModel):
+    min_price: int | None = Field(None, ge=0, description='In minor units of currency')
+    max_price: int | None = Field(None, ge=0, description='In minor units of currency')
+    min_rating: float | None = Field(None, ge=0, le=5)
+    in_stock: bool = True
+    sort: Literal['price', '-price', 'rating', 'newest', 'popular'] | None = None
+    limit: int | None = Field(None, ge=1, le=500)
+    cursor: str | None = None
+    # Валюта покупателя: в ней задаются min_price/max_price и считается display_price
+    currency: str | None = Field(None, pattern='^[A-Z]{3}$')
+
+class ProductOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    slug: str
+    description: str
+    price: int = Field(description='Price in minor units of currency')
+    currency: str
+    display_price: int | None = None
+    display_currency: str | None = None
+    image_url: str
+    stock: int
+    rating: float
+    supplier_id: int | None
+    category_id: int
+    is_active: bool
+
+    @computed_field
+    @property
+    def images(self) -> dict[str, str] | None:
+        return variants_from_url(self.image_url)
+
+class ReviewOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    product_id: int
+    comment: str | None
+    comment_date: datetime
+    grade: int
+    is_active: bool
+    version: int
+    updated_at: datetime
+
+
+class RelatedProducts(BaseModel):
+    top_in_category: list[ProductOut] = []
+    also_reviewed: list[ProductOut] = []
+
+
+class UpdateRates(BaseModel):
+    # Сколько единиц валюты за единицу базовой валюты
+    rates: dict[str, float] = Field(min_length=1)
+
+
+class AuditOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    created_at: datetime
+    actor_id: int | None
+    actor: str | None
+    action: str
+    target_type: str
+    target_id: str
+    diff: dict | None
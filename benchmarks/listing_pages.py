@@ -0,0 +1,108 @@
+"""Benchmark deep pages of filtered, sorted product listings (keyset pagination).
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/listing.db python -m benchmarks.listing_pages --products 500000
+
+An empty database is first filled by ``app.backend.generate``; a database that already has
+products is used as is, so Postgres can be benchmarked on its own data. The script walks the
+largest category page by page through the API for several filter/sort combinations and prints
+the time of the first and the deepest page, then times an OFFSET query for the same depth.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault('SECRET_KEY_JWT', 'benchmark')
+os.environ.setdefault('ALGORYTHM_JWT', 'HS256')
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, or_, select
+
+from app.backend.db import engine, session_maker, unindexed
+from app.backend.fixtures import create_schema
+from app.backend.generate import generate
+from app.backend.listing import filter_products
+from app.main import app
+from app.models import Category, Product
+from app.schemas import ProductFilter
+
+CASES = [
+    ('price', 'min_price=100000&max_price=9000000'),
+    ('-price', 'min_rating=2'),
+    ('rating', 'min_rating=1'),
+    ('rating', 'min_price=100000&max_price=9000000'),
+    ('newest', 'in_stock=false'),
+    ('popular', 'in_stock=false'),
+]
+
+
+async def prepare(products: int, seed: int) -> str:
+    if engine.dialect.name == 'sqlite':
+        await create_schema()
+    async with session_maker() as session:
+        if not await session.scalar(select(func.count(Product.id))):
+            await generate(seed, users=max(100, products // 20), categories=max(10, products // 2000),
+                           depth=3, products=products, reviews=products * 3)
+        # Самая большая категория вместе с прямыми подкатегориями, как в product_by_category
+        root = func.coalesce(Category.parent_id, Category.id)
+        return await session.scalar(
+            select(Category.slug)
+            .where(Category.id == (
+                select(root)
+                .join(Product, Product.category_id == Category.id)
+                .group_by(root)
+                .order_by(func.count().desc())
+                .limit(1)
+                .scalar_subquery()
+            ))
+        )
+
+
+async def offset_page(slug: str, depth: int, limit: int) -> float:
+    async with session_maker() as session:
+        parent = select(Category.id).where(Category.slug == slug).scalar_subquery()
+        ids = select(Category.id).where(or_(Category.slug == slug, Category.parent_id == parent))
+        # Как в product_by_category для поддерева: без курсора страницу ведёт фильтр по цене
+        statement = filter_products(select(Product).where(unindexed(Product.category_id).in_(ids)),
+                                    ProductFilter(sort='price', min_price=100000, max_price=9000000, limit=limit))
+        started = time.perf_counter()
+        await session.scalars(statement.offset(depth))
+        return (time.perf_counter() - started) * 1000
+
+
+def walk(client: TestClient, url: str, pages: int) -> list[float]:
+    times, cursor = [], None
+    for _ in range(pages):
+        started = time.perf_counter()
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        times.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyset pagination of product listings')
+    parser.add_argument('--products', type=int, default=500000, help='products to generate into an empty database')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pages', type=int, default=400, help='pages to walk per case')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    engine.echo = False
+
+    with TestClient(app) as client:
+        slug = client.portal.call(prepare, args.products, args.seed)
+        print(f'category {slug}, {args.limit} products per page')
+        for sort, filters in CASES:
+            times = walk(client, f'/products/{slug}?sort={sort}&{filters}&limit={args.limit}', args.pages)
+            print(f'sort={sort:7} {filters:35} page 1 {times[0]:7.1f} ms   page {len(times):>4} {times[-1]:7.1f} ms'
+                  f'   mean {sum(times) / len(times):7.1f} ms')
+        depth = args.limit * (args.pages - 1)
+        print(f'OFFSET {depth} (sort=price, price range, SQL only): '
+              f'{client.portal.call(offset_page, slug, depth, args.limit):.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
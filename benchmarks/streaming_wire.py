@@ -0,0 +1,99 @@
+"""Benchmark bytes on the wire and peak memory of streamed, compressed list responses.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/streaming.db python -m benchmarks.streaming_wire --products 100000
+
+An empty database is first filled by ``app.backend.generate``. The ASGI app is called
+directly (no network, no HTTP client buffering) and every body chunk is counted as it is
+sent; peak memory is measured with tracemalloc. The buffered baseline builds the whole
+list the way the endpoints did before streaming.
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('SECRET_KEY_JWT', 'benchmark')
+os.environ.setdefault('ALGORYTHM_JWT', 'HS256')
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+
+from app.backend.db import engine, session_maker
+from app.backend.fixtures import create_schema
+from app.backend.generate import generate
+from app.main import app
+from app.models import Category, Product
+from app.schemas import ProductOut
+
+
+async def prepare(products: int, seed: int) -> int:
+    if engine.dialect.name == 'sqlite':
+        await create_schema()
+    async with session_maker() as session:
+        if not await session.scalar(select(func.count(Product.id))):
+            await generate(seed, users=max(100, products // 20), categories=max(10, products // 2000),
+                           depth=3, products=products, reviews=products)
+        return await session.scalar(select(func.count(Product.id)).where(Product.stock > 0))
+
+
+async def call(path: str, encoding: str | None) -> int:
+    """Bytes of the response body for ``GET path``."""
+    size = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal size
+        if message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+
+    headers = [(b'accept-encoding', encoding.encode())] if encoding else []
+    scope = dict(type='http', method='GET', path=path, raw_path=path.encode(), query_string=b'', root_path='',
+                 headers=headers, scheme='http', server=('bench', 80), client=('bench', 1), http_version='1.1',
+                 asgi={'version': '3.0'}, app=app)
+    await app(scope, receive, send)
+    return size
+
+
+async def buffered() -> int:
+    async with session_maker() as session:
+        rows = (await session.scalars(select(Product).join(Category).where(Product.stock > 0))).all()
+        return len(JSONResponse(jsonable_encoder([ProductOut.model_validate(row) for row in rows])).body)
+
+
+async def main(products: int, seed: int) -> None:
+    engine.echo = False
+    rows = await prepare(products, seed)
+    print(f'{rows} products in stock')
+    cases = [
+        ('buffered list', buffered),
+        ('streamed, identity', lambda: call('/products/', None)),
+        ('streamed, gzip', lambda: call('/products/', 'gzip')),
+        ('streamed, br', lambda: call('/products/', 'br')),
+        ('reviews, br', lambda: call('/review/', 'br')),
+    ]
+    for label, run in cases:
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = await run()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{label:20} {size / 1e6:8.2f} MB on the wire   peak {peak / 2 ** 20:7.1f} MiB   {elapsed:6.2f} s')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark streamed list responses')
+    parser.add_argument('--products', type=int, default=100000, help='products to generate into an empty database')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.seed))
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from datetime import timedelta
+
+import pytest
+
+# Тесты идут на sqlite в памяти; окружение задаётся до импорта приложения, конфиг читается при импорте
+os.environ.update(DB_BACKEND='sqlite', DB_SQLITE_PATH=':memory:', DB_COUNT_QUERIES='true', CURRENCY_BASE='RUB')
+os.environ.setdefault('SECRET_KEY_JWT', 'test-secret')
+os.environ.setdefault('ALGORYTHM_JWT', 'HS256')
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.backend.db import session_maker
+from app.backend.fixtures import restore_snapshot, take_snapshot
+from app.main import app
+from app.models import Category, Product
+from app.models.user import User
+from app.routers.auth import create_access_token
+
+ADMIN, SUPPLIER, OTHER_SUPPLIER, CUSTOMER = 1, 2, 3, 4
+
+
+async def seed() -> None:
+    async with session_maker() as session:
+        await session.execute(insert(User), [
+            dict(id=user_id, first_name='Test', last_name='User', username=username,
+                 email=f'{username}@example.com', hashed_password='x',
+                 is_admin=is_admin, is_supplier=is_supplier, is_customer=not (is_admin or is_supplier))
+            for user_id, username, is_admin, is_supplier in (
+                (ADMIN, 'admin', True, False),
+                (SUPPLIER, 'supplier', False, True),
+                (OTHER_SUPPLIER, 'other', False, True),
+                (CUSTOMER, 'customer', False, False),
+            )
+        ])
+        await session.execute(insert(Category), [
+            dict(id=1, name='Food', slug='food'),
+            dict(id=2, name='Toys', slug='toys'),
+        ])
+        await session.execute(insert(Product), [
+            dict(id=product_id, name=name, slug=slug, description='', price=price, image_url='', stock=5,
+                 rating=0.0, category_id=1, supplier_id=SUPPLIER)
+            for product_id, name, slug, price in ((1, 'Phone', 'phone', 1000), (2, 'Lamp', 'lamp', 500))
+        ])
+        await session.commit()
+
+
+@pytest.fixture(scope='session')
+def app_client():
+    with TestClient(app) as client:
+        client.portal.call(seed)
+        snapshot = client.portal.call(take_snapshot)
+        yield client, snapshot
+        client.portal.call(snapshot.close)
+
+
+@pytest.fixture
+def client(app_client) -> TestClient:
+    """Test client on a freshly restored copy of the seeded database."""
+    client, snapshot = app_client
+    client.portal.call(restore_snapshot, snapshot)
+    return client
+
+
+def auth(username: str, user_id: int, is_admin: bool = False, is_supplier: bool = False) -> dict[str, str]:
+    token = asyncio.run(create_access_token(username, user_id, is_admin, is_supplier,
+                                            not (is_admin or is_supplier), timedelta(minutes=5)))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def query_count(response) -> int:
+    return int(response.headers['X-Query-Count'])
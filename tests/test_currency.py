@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.backend.currency import get_rates, read_rates_file, swap_rates
+from tests.conftest import ADMIN, SUPPLIER, auth
+
+SUPPLIER_HEADERS = auth('supplier', SUPPLIER, is_supplier=True)
+ADMIN_HEADERS = auth('admin', ADMIN, is_admin=True)
+
+
+@pytest.fixture
+def catalogue(client):
+    """Phone (10 RUB) and lamp (5 RUB) from the seed plus goods priced in USD, JPY and EUR."""
+    previous = get_rates()
+    response = client.put('/currency/rates', json={'rates': {'USD': 0.01, 'EUR': 0.008, 'JPY': 1.5}},
+                          headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    for name, price, currency in (('Tea', 333, 'USD'), ('Sake', 301, 'JPY'), ('Cheese', 999, 'EUR')):
+        response = client.post('/products/', json=dict(name=name, description='', price=price, image_url='',
+                                                       stock=1, category=1, currency=currency),
+                               headers=SUPPLIER_HEADERS)
+        assert response.status_code == 201
+    yield client
+    # Курсы - глобальный снимок процесса, база откатывается фикстурой client, а он нет
+    swap_rates(previous.rates)
+
+
+def display_prices(client, **params) -> dict[str, tuple[int, int, str]]:
+    products = client.get('/products/', params={'limit': 10, **params}).json()
+    return {product['slug']: (product['price'], product['display_price'], product['display_currency'])
+            for product in products}
+
+
+def test_products_default_to_the_base_currency(client):
+    # Товары из фикстуры вставлены без валюты, новый - через API без currency
+    response = client.post('/products/', json=dict(name='Kettle', description='', price=150000, image_url='',
+                                                   stock=1, category=1), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 201
+    products = client.get('/products/', params={'sort': 'price', 'limit': 10}).json()
+    assert [(product['slug'], product['price'], product['currency']) for product in products] == [
+        ('lamp', 500, get_rates().base), ('phone', 1000, get_rates().base), ('kettle', 150000, get_rates().base)
+    ]
+
+
+def test_unknown_currency(client):
+    response = client.post('/products/', json=dict(name='Kettle', description='', price=1, image_url='', stock=1,
+                                                   category=1, currency='XYZ'), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 400
+    assert client.get('/products/', params={'currency': 'XYZ', 'limit': 1}).status_code == 400
+
+
+@pytest.mark.parametrize('rates', [{'USD': 0}, {'USD': -0.01}, {'USD': 'inf'}, {'usd': 0.01}])
+def test_rates_file_rejects_invalid_rates(tmp_path, rates):
+    path = tmp_path / 'rates.json'
+    path.write_text(json.dumps({'base': get_rates().base, 'rates': rates}))
+    with pytest.raises(ValueError, match='Invalid rates'):
+        read_rates_file(str(path))
+
+
+@pytest.mark.parametrize('currency, expected', [
+    # Sake: 301 JPY = 200.67 USD-центов, Cheese: 9.99 EUR = 12.4875 USD - округляются до ближайшего
+    ('USD', {'phone': 10, 'lamp': 5, 'tea': 333, 'sake': 201, 'cheese': 1249}),
+    ('RUB', {'phone': 1000, 'lamp': 500, 'tea': 33300, 'sake': 20067, 'cheese': 124875}),
+    ('EUR', {'phone': 8, 'lamp': 4, 'tea': 266, 'sake': 161, 'cheese': 999}),
+])
+def test_display_price_in_callers_currency(catalogue, currency, expected):
+    prices = display_prices(catalogue, currency=currency)
+    assert {slug: display for slug, (_, display, _) in prices.items()} == expected
+    assert {display_currency for _, _, display_currency in prices.values()} == {currency}
+    # Сама цена остаётся в валюте товара
+    assert prices['sake'][0] == 301 and prices['cheese'][0] == 999
+
+
+def test_no_display_price_without_currency(catalogue):
+    prices = display_prices(catalogue)
+    assert prices['tea'] == (333, None, None)
+
+
+@pytest.mark.parametrize('params, expected', [
+    # Границы в валюте покупателя, сравниваются с точной ценой, а не с округлённой
+    ({'currency': 'USD', 'min_price': 200, 'max_price': 1249}, {'tea', 'sake', 'cheese'}),
+    ({'currency': 'USD', 'min_price': 200, 'max_price': 1248}, {'tea', 'sake'}),
+    ({'currency': 'USD', 'min_price': 10}, {'phone', 'tea', 'sake', 'cheese'}),
+    ({'currency': 'USD', 'max_price': 5}, {'lamp'}),
+    ({'currency': 'JPY', 'min_price': 301, 'max_price': 301}, {'sake'}),
+    ({'currency': 'EUR', 'max_price': 8}, {'phone', 'lamp'}),
+    # Без currency границы в базовой валюте (копейки)
+    ({'min_price': 20066, 'max_price': 33300}, {'tea', 'sake'}),
+    ({'min_price': 20067, 'max_price': 33299}, set()),
+])
+def test_price_range_in_callers_currency(catalogue, params, expected):
+    assert set(display_prices(catalogue, **params)) == expected
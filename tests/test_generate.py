@@ -0,0 +1,26 @@
+import numpy as np
+from sqlalchemy import func, select
+
+from app.backend.db import engine
+from app.backend.generate import copy_rows, generate_categories
+from app.models import Category
+
+
+async def load_categories(batch_size: int) -> tuple[list, int]:
+    rows = generate_categories(np.random.default_rng(1), 5, 2)
+    # Сдвигаем id за категории из фикстуры
+    rows['id'] = [category_id + 100 for category_id in rows['id']]
+    rows['parent_id'] = [None if parent is None else parent + 100 for parent in rows['parent_id']]
+    async with engine.connect() as conn:
+        await copy_rows(conn, Category.__table__, rows, batch_size)
+        slugs = (await conn.scalars(select(Category.slug).where(Category.id > 100).order_by(Category.id))).all()
+        total = await conn.scalar(select(func.count()).select_from(Category.__table__))
+        await conn.rollback()
+    return slugs, total
+
+
+def test_copy_rows_falls_back_to_batched_inserts(client):
+    # aiosqlite не умеет COPY: строки идут пачками executemany, последняя пачка неполная
+    slugs, total = client.portal.call(load_categories, 2)
+    assert slugs == [f'category-{i}' for i in range(1, 6)]
+    assert total == 7
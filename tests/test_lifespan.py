@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+import app.main
+from app.main import app as application, lifespan
+
+
+class FakeBuffer:
+    def __init__(self, calls: list, name: str, fail: bool = False):
+        self.calls, self.name, self.fail = calls, name, fail
+
+    def start(self):
+        self.calls.append(f'{self.name} start')
+
+    async def stop(self):
+        self.calls.append(f'{self.name} stop')
+        if self.fail:
+            raise RuntimeError(f'{self.name} flush failed')
+
+
+def test_failing_stop_does_not_skip_the_others(monkeypatch):
+    calls = []
+
+    async def start_rates():
+        calls.append('rates start')
+
+    async def stop_rates():
+        calls.append('rates stop')
+
+    monkeypatch.setattr(app.main, 'start_rates', start_rates)
+    monkeypatch.setattr(app.main, 'stop_rates', stop_rates)
+    monkeypatch.setattr(app.main, 'view_counter', FakeBuffer(calls, 'views', fail=True))
+    monkeypatch.setattr(app.main, 'audit_log', FakeBuffer(calls, 'audit'))
+    monkeypatch.setattr(app.main, 'shutdown_executor', lambda: calls.append('executor'))
+    monkeypatch.setattr(app.main.config.site, 'backend', 'postgres')
+
+    async def run():
+        async with lifespan(application):
+            calls.append('serving')
+
+    with pytest.raises(RuntimeError, match='views flush failed'):
+        asyncio.run(run())
+    assert calls == ['rates start', 'views start', 'audit start', 'serving',
+                     'audit stop', 'views stop', 'rates stop', 'executor']
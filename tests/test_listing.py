@@ -0,0 +1,55 @@
+import base64
+import json
+
+import pytest
+from sqlalchemy import select, text
+
+from app.backend.db import engine, session_maker, unindexed
+from app.backend.listing import filter_products
+from app.models import Product
+from app.schemas import ProductFilter
+
+
+def cursor(sort: str | None, values) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, values]).encode()).decode()
+
+
+def test_pages_follow_the_cursor(client):
+    first = client.get('/products/?sort=price&limit=1')
+    assert [product['slug'] for product in first.json()] == ['lamp']
+    second = client.get(f'/products/?sort=price&limit=1&cursor={first.headers["X-Next-Cursor"]}')
+    assert [product['slug'] for product in second.json()] == ['phone']
+    assert 'X-Next-Cursor' not in second.headers
+
+
+def test_invalid_cursor(client):
+    for sort, value in (('price', 'not base64'), ('price', cursor('price', ['x', 'y'])),
+                        ('price', cursor('price', [True, 1])), ('price', cursor('price', [2 ** 64, 1])),
+                        ('price', cursor('price', [1, 2 ** 40])),
+                        ('price', cursor('rating', [4.5, 1])), ('rating', cursor('rating', [None, 1])),
+                        (None, cursor(None, [1, 2]))):
+        params = {'limit': 1, 'cursor': value} | ({'sort': sort} if sort else {})
+        assert client.get('/products/', params=params).status_code == 400
+
+
+async def query_plan(params: ProductFilter) -> str:
+    # Фильтр мягкого удаления добавляет ORM при выполнении, в скомпилированный текст он не попадает
+    statement = filter_products(select(Product).where(unindexed(Product.category_id).in_([1, 2]),
+                                                      Product.is_active == True), params)
+    sql = statement.compile(engine, compile_kwargs={'literal_binds': True})
+    async with session_maker() as session:
+        return ' | '.join(row[-1] for row in await session.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+
+
+@pytest.mark.parametrize('params, index', [
+    (ProductFilter(sort='rating', min_price=100, max_price=1000, limit=50), 'ix_products_active_rating'),
+    (ProductFilter(sort='rating', min_price=100, cursor=cursor('rating', [4.5, 10]), limit=50),
+     'ix_products_active_rating'),
+    (ProductFilter(sort='price', min_rating=2, limit=50), 'ix_products_active_price'),
+    (ProductFilter(sort='price', min_price=100, cursor=cursor('price', [500, 2]), limit=50),
+     'ix_products_active_price'),
+    (ProductFilter(sort='popular', in_stock=False, limit=50), 'ix_products_active_popularity'),
+])
+def test_sqlite_pages_walk_the_sort_key_index(client, params, index):
+    plan = client.portal.call(query_plan, params)
+    assert index in plan and 'TEMP B-TREE' not in plan, plan
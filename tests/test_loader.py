@@ -0,0 +1,85 @@
+import asyncio
+
+from app.backend.db import count_queries, session_maker
+from app.backend.loader import Loader
+from app.models import Category, Product
+from app.models.user import User
+from tests.conftest import ADMIN, CUSTOMER, SUPPLIER, auth, query_count
+
+ADMIN_HEADERS = auth('admin', ADMIN, is_admin=True)
+SUPPLIER_HEADERS = auth('supplier', SUPPLIER, is_supplier=True)
+
+
+def test_concurrent_lookups_are_batched(client):
+    async def lookups():
+        async with session_maker() as session:
+            loader = Loader(session)
+            with count_queries() as queries:
+                products = await asyncio.gather(loader.load(Product, id=1), loader.load(Product, id=2),
+                                                loader.load(Product, id=1), loader.load(Product, slug='lamp'),
+                                                loader.load(Product, id=42))
+            return [product and product.slug for product in products], len(queries), products
+
+    slugs, queries, products = client.portal.call(lookups)
+    assert slugs == ['phone', 'lamp', 'phone', 'lamp', None]
+    assert queries == 1
+    assert products[0] is products[2] and products[1] is products[3]
+
+
+def test_repeated_lookups_are_served_from_memory(client):
+    async def lookups():
+        async with session_maker() as session:
+            loader = Loader(session)
+            with count_queries() as queries:
+                phone = await loader.load(Product, slug='phone')
+                same = [await loader.load(Product, id=1), *await loader.load_many(Product, 'slug', ['phone'])]
+                user = await loader.load(User, username='supplier')
+                category = await loader.load(Category, id=phone.category_id)
+            return phone, same, user.id, category.slug, len(queries)
+
+    phone, same, user_id, category_slug, queries = client.portal.call(lookups)
+    assert all(product is phone for product in same)
+    assert (user_id, category_slug) == (SUPPLIER, 'food')
+    # Товар, пользователь и категория: по одному запросу на модель
+    assert queries == 3
+
+
+def test_product_detail_queries(client):
+    response = client.get('/products/detail/phone')
+    assert response.status_code == 200
+    assert query_count(response) == 2
+    not_modified = client.get('/products/detail/phone', headers={'If-None-Match': response.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert query_count(not_modified) == 1
+
+
+def test_listing_queries(client):
+    # Категория с подкатегориями ищется отдельным запросом перед страницей товаров
+    for path, queries in (('/products/?limit=1', 1), ('/products/food?sort=price', 2),
+                          ('/products/detail/phone/related', 1)):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert query_count(response) == queries
+
+
+def test_create_review_queries(client):
+    review = dict(user_id=CUSTOMER, product_id=1, comment='Good', rate_grade=4)
+    response = client.post('/review/', json=review, headers=SUPPLIER_HEADERS)
+    assert response.status_code == 201
+    # Товар, INSERT отзыва, avg(grade) и UPDATE рейтинга
+    assert query_count(response) == 4
+    assert client.get('/products/detail/phone').json()['rating'] == 4
+
+    response = client.post('/review/', json={**review, 'product_id': 42}, headers=SUPPLIER_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 1
+
+
+def test_supplier_permission_queries(client):
+    response = client.patch('/permission/', params={'user_id': CUSTOMER}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert query_count(response) == 2
+
+    response = client.patch('/permission/', params={'user_id': 42}, headers=ADMIN_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 1
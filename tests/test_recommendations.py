@@ -0,0 +1,93 @@
+import numpy as np
+from sqlalchemy import insert
+
+from app.backend.db import session_maker
+from app.backend.recommendations import also_reviewed, build_recommendations, category_paths, top_in_category
+from app.models import Category, Product
+from app.models.review import Review
+from tests.conftest import CUSTOMER, SUPPLIER
+
+# Дерево: 1 > 2 > 3 и отдельный корень 4
+PRODUCT_IDS = np.array([10, 11, 12, 20, 30, 40, 41])
+PATHS = np.array([[3, 2, 1], [3, 2, 1], [3, 2, 1], [2, 1, -1], [1, -1, -1], [4, -1, -1], [4, -1, -1]])
+RATINGS = np.array([4.0, 5.0, 3.0, 4.5, 4.9, 1.0, 2.0])
+IN_STOCK = np.array([True, True, False, True, True, True, False])
+
+
+def as_lists(result) -> dict[int, list[int]]:
+    lists = {}
+    for product_id, rank, related_id in sorted(zip(*(array.tolist() for array in result))):
+        assert rank == len(lists.setdefault(product_id, []))
+        lists[product_id].append(related_id)
+    return lists
+
+
+def test_category_paths():
+    assert category_paths(np.array([1, 2, 3, 4]), np.array([-1, 1, 2, -1])) == {
+        1: [1], 2: [2, 1], 3: [3, 2, 1], 4: [4]
+    }
+    # Цикл в parent_id не зацикливает обход
+    assert category_paths(np.array([5, 6]), np.array([6, 5])) == {5: [5, 6], 6: [6, 5]}
+
+
+def test_top_in_category_prefers_the_own_category():
+    assert as_lists(top_in_category(PRODUCT_IDS, PATHS, RATINGS, IN_STOCK, top=1)) == {
+        # В категории 3 в наличии 10 и 11 - хватает на один товар без самого себя
+        10: [11], 11: [10], 12: [11],
+        # В 2 лучший 11 (5.0), а не 30 (4.9) из корня
+        20: [11], 30: [11],
+        # В корне 4 в наличии только 40, выше подниматься некуда
+        41: [40],
+    }
+
+
+def test_top_in_category_falls_back_to_the_parent():
+    # В категории 3 в наличии два товара, для двух соседей нужно три: берётся поддерево 2
+    assert as_lists(top_in_category(PRODUCT_IDS, PATHS, RATINGS, IN_STOCK, top=2)) == {
+        10: [11, 20], 11: [20, 10], 12: [11, 20],
+        20: [11, 10],
+        30: [11, 20],
+        41: [40],
+    }
+
+
+def test_top_in_category_without_stock():
+    assert all(not len(array) for array in top_in_category(PRODUCT_IDS, PATHS, RATINGS,
+                                                            np.zeros(len(PRODUCT_IDS), dtype=bool), top=2))
+
+
+def test_also_reviewed():
+    user_ids = np.array([1, 1, 1, 1, 2, 2, 3, 3, 3])
+    # Повторный отзыв считается один раз, отзыв на неактивный товар 99 отбрасывается
+    review_product_ids = np.array([10, 11, 12, 10, 10, 11, 11, 20, 99])
+    assert as_lists(also_reviewed(user_ids, review_product_ids, np.array([10, 11, 12, 20]), top=2)) == {
+        10: [11, 12], 11: [10, 12], 12: [10, 11], 20: [11],
+    }
+
+
+async def seed_catalogue() -> None:
+    async with session_maker() as session:
+        await session.execute(insert(Category), [dict(id=3, name='Fruit', slug='fruit', parent_id=1)])
+        await session.execute(insert(Product), [
+            dict(id=product_id, name=slug.title(), slug=slug, description='', price=100, image_url='', stock=5,
+                 rating=rating, category_id=3, supplier_id=SUPPLIER)
+            for product_id, slug, rating in ((3, 'apple', 5.0), (4, 'pear', 4.0), (5, 'cherry', 3.0))
+        ])
+        await session.execute(insert(Review), [
+            dict(user_id=CUSTOMER, product_id=product_id, comment='', grade=5) for product_id in (1, 3)
+        ])
+        await session.commit()
+
+
+def test_related_products_endpoint(client):
+    client.portal.call(seed_catalogue)
+    client.portal.call(build_recommendations, 2)
+
+    def related(slug: str) -> dict[str, list[str]]:
+        response = client.get(f'/products/detail/{slug}/related')
+        assert response.status_code == 200
+        return {kind: [product['slug'] for product in products] for kind, products in response.json().items()}
+
+    assert related('apple') == {'top_in_category': ['pear', 'cherry'], 'also_reviewed': ['phone']}
+    assert related('phone') == {'top_in_category': ['apple', 'pear'], 'also_reviewed': ['apple']}
+    assert client.get('/products/detail/missing/related').status_code == 404
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.backend.streaming import iter_json_array
+from app.models import Product
+from app.schemas import ProductOut
+from tests.conftest import SUPPLIER, auth
+
+SUPPLIER_HEADERS = auth('supplier', SUPPLIER, is_supplier=True)
+
+
+def collect(client, statement, **kwargs) -> bytes:
+    async def read():
+        return b''.join([chunk async for chunk in iter_json_array(statement, ProductOut, **kwargs)])
+    return client.portal.call(read)
+
+
+def test_stream_is_read_in_keyset_batches(client):
+    for i in range(3):
+        client.post('/products/', json=dict(name=f'Item {i}', description='', price=100 + i, image_url='',
+                                            stock=1, category=2), headers=SUPPLIER_HEADERS)
+    statement = select(Product).order_by(Product.price.desc(), Product.id.desc())
+    for batch_size in (1, 2, 5, 1000):
+        body = collect(client, statement, key=(Product.price, Product.id), descending=True, batch_size=batch_size)
+        assert [product['price'] for product in json.loads(body)] == [1000, 500, 102, 101, 100]
+
+
+def test_empty_stream(client):
+    assert collect(client, select(Product).where(Product.price < 0).order_by(Product.id), key=(Product.id,)) == b'[]'
+
+
+def test_failed_batch_aborts_the_stream(client):
+    batches = []
+
+    def transform(rows):
+        batches.append(rows)
+        if len(batches) == 2:
+            raise ConnectionError('lost the database')
+        return rows
+
+    async def read():
+        chunks = []
+        with pytest.raises(ConnectionError):
+            async for chunk in iter_json_array(select(Product).order_by(Product.id), ProductOut,
+                                               key=(Product.id,), batch_size=1, transform=transform):
+                chunks.append(chunk)
+        return b''.join(chunks)
+
+    # Закрывающей скобки нет: клиент видит, что тело оборвано
+    assert not client.portal.call(read).endswith(b']')
+
+
+def test_listing_streams_without_limit(client):
+    response = client.get('/products/', params={'sort': '-price'})
+    assert [product['slug'] for product in response.json()] == ['phone', 'lamp']
+    response = client.get('/review/')
+    assert response.json() == []
+
+
+def test_range_responses_are_not_compressed():
+    from app.backend.compression import CompressionMiddleware
+
+    async def partial_file(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 206,
+                    'headers': [(b'content-type', b'text/plain'), (b'content-range', b'bytes 0-4095/10000')]})
+        await send({'type': 'http.response.body', 'body': b'a' * 4096})
+
+    async def run():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+        await CompressionMiddleware(partial_file)({'type': 'http', 'headers': [(b'accept-encoding', b'gzip')]},
+                                                  None, send)
+        return sent
+
+    start, body = asyncio.run(run())
+    assert b'content-encoding' not in dict(start['headers'])
+    assert body['body'] == b'a' * 4096
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+
+from app.backend.views import ViewCounter, view_counter
+
+
+def test_only_full_responses_count_as_views(client):
+    view_counter._counts.clear()
+    response = client.get('/products/detail/phone')
+    client.get('/products/detail/phone', headers={'If-None-Match': response.headers['ETag']})
+    client.get('/products/detail/lamp')
+    assert view_counter._counts == {1: 1, 2: 1}
+
+
+def test_failed_final_flush_is_logged(monkeypatch, caplog):
+    counter = ViewCounter()
+
+    async def failing_flush():
+        raise ConnectionError('database is gone')
+
+    monkeypatch.setattr(counter, 'flush', failing_flush)
+    counter.add(1)
+    counter.add(1)
+    counter.add(2)
+    with caplog.at_level(logging.ERROR, logger='app.backend.views'):
+        asyncio.run(counter.stop())
+    assert 'Failed to write 3 product view counts on shutdown: {1: 2, 2: 1}' in caplog.text
@@ -0,0 +1,122 @@
+from tests.conftest import ADMIN, OTHER_SUPPLIER, SUPPLIER, auth, query_count
+
+ADMIN_HEADERS = auth('admin', ADMIN, is_admin=True)
+SUPPLIER_HEADERS = auth('supplier', SUPPLIER, is_supplier=True)
+OTHER_SUPPLIER_HEADERS = auth('other', OTHER_SUPPLIER, is_supplier=True)
+
+
+def new_user(username: str, email: str | None = None) -> dict:
+    return dict(first_name='New', last_name='User', username=username,
+                email=email or f'{username}@example.com', password='secret')
+
+
+def new_product(name: str = 'Phone', category: int = 1) -> dict:
+    return dict(name=name, description='', price=1500, image_url='', stock=3, category=category)
+
+
+def test_create_user(client):
+    response = client.post('/auth/', json=new_user('new'))
+    assert response.status_code == 201
+    assert query_count(response) == 1
+
+
+def test_create_user_conflict(client):
+    for user in (new_user('admin'), new_user('new', email='admin@example.com')):
+        response = client.post('/auth/', json=user)
+        assert response.status_code == 409
+        assert query_count(response) == 1
+
+
+def test_create_category_picks_next_free_slug(client):
+    slugs = []
+    for _ in range(3):
+        response = client.post('/categories/', json={'name': 'Food'}, headers=ADMIN_HEADERS)
+        assert response.status_code == 201
+        assert query_count(response) == 1
+        slugs.append(response.json()['slug'])
+    assert slugs == ['food-2', 'food-3', 'food-4']
+
+
+def test_slug_suffix_ignores_long_numbers_in_names(client):
+    for name, slug in (('Cable 20230101123', 'cable-20230101123'),
+                       ('Cable 99999999999999999999999', 'cable-99999999999999999999999'),
+                       ('Cable', 'cable'), ('Cable', 'cable-2')):
+        response = client.post('/categories/', json={'name': name}, headers=ADMIN_HEADERS)
+        assert response.status_code == 201
+        assert response.json()['slug'] == slug
+
+
+def test_slug_of_a_name_without_letters(client):
+    for name, slug in (('!!!', 'category'), ('???', 'category-2')):
+        response = client.post('/categories/', json={'name': name}, headers=ADMIN_HEADERS)
+        assert response.status_code == 201
+        assert response.json()['slug'] == slug
+    response = client.post('/products/', json=new_product('!!!'), headers=SUPPLIER_HEADERS)
+    assert response.json()['slug'] == 'product'
+    response = client.put('/categories/category', json={'name': '...'}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert [category['slug'] for category in client.get('/categories/').json()][-2:] == ['category', 'category-2']
+
+
+def test_create_category_missing_parent(client):
+    response = client.post('/categories/', json={'name': 'Sub', 'parent_id': 42}, headers=ADMIN_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 2
+
+
+def test_update_category(client):
+    response = client.put('/categories/toys', json={'name': 'Food', 'parent_id': 1}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert query_count(response) == 1
+    assert [category['slug'] for category in client.get('/categories/').json()] == ['food', 'food-2']
+
+
+def test_update_category_not_found(client):
+    response = client.put('/categories/nope', json={'name': 'Food'}, headers=ADMIN_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 2
+
+
+def test_create_product(client):
+    response = client.post('/products/', json=new_product(), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 201
+    assert query_count(response) == 1
+    assert response.json()['slug'] == 'phone-2'
+
+
+def test_create_product_missing_category(client):
+    response = client.post('/products/', json=new_product(category=42), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 2
+
+
+def test_update_product(client):
+    response = client.put('/products/phone', json=new_product('Phone'), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 200
+    assert query_count(response) == 1
+    assert client.get('/products/detail/phone').json()['price'] == 1500
+
+
+def test_update_product_of_another_supplier(client):
+    response = client.put('/products/phone', json=new_product(), headers=OTHER_SUPPLIER_HEADERS)
+    assert response.status_code == 403
+    assert query_count(response) == 2
+
+
+def test_update_product_not_found(client):
+    response = client.put('/products/nope', json=new_product(), headers=SUPPLIER_HEADERS)
+    assert response.status_code == 404
+    assert query_count(response) == 2
+
+
+def test_delete_product(client):
+    response = client.delete('/products/lamp', headers=SUPPLIER_HEADERS)
+    assert response.status_code == 200
+    assert query_count(response) == 1
+    assert client.get('/products/detail/lamp').status_code == 404
+
+
+def test_delete_product_of_another_supplier(client):
+    response = client.delete('/products/lamp', headers=OTHER_SUPPLIER_HEADERS)
+    assert response.status_code == 403
+    assert query_count(response) == 2